@@ -0,0 +1,84 @@
+"""
+Throughput benchmark for the ASGI adapter.
+
+This drives the ASGI application in-process exactly as an ASGI server (e.g. uvicorn)
+would, with a configurable number of concurrent in-flight requests, and reports the
+achieved request rate. The handler simulates downstream I/O with an asyncio sleep.
+
+Usage: python benchmarks/asgi_throughput.py [requests] [concurrency] [handler_delay_ms]
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from slack_server import slack_event_webhook_asgi  # noqa: E402
+
+SECRET = "benchmark-secret"
+
+
+def build_request(body: bytes) -> dict:
+    timestamp = str(int(time.time()))
+    signature = (
+        "v0="
+        + hmac.new(
+            SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256
+        ).hexdigest()
+    )
+
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": "/slack/events",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-slack-request-timestamp", timestamp.encode()),
+            (b"x-slack-signature", signature.encode()),
+        ],
+    }
+
+
+async def run(total: int, concurrency: int, delay: float):
+    @slack_event_webhook_asgi(SECRET)
+    async def app(payload):
+        await asyncio.sleep(delay)
+        return {}
+
+    body = b'{"type": "event_callback", "event": {"type": "message", "text": "hi"}}'
+    scope = build_request(body)
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def one():
+        async with semaphore:
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            await app(scope, receive, send)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    failures = sum(1 for status in statuses if status != 200)
+    print(
+        f"{total} requests, concurrency {concurrency}, handler delay {delay * 1000:.0f}ms: "
+        f"{elapsed:.2f}s, {total / elapsed:.0f} req/s, {failures} failures"
+    )
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    delay = (float(sys.argv[3]) if len(sys.argv) > 3 else 10) / 1000
+
+    asyncio.run(run(total, concurrency, delay))
@@ -0,0 +1,64 @@
+"""
+Benchmark for the deferral pipeline, using the local backends.
+
+Publishes a number of envelopes through slack_defer, then drains them in batches
+through a slack_deferred_handler, and reports the rate of each stage.
+
+Usage: python benchmarks/deferral_pipeline.py [messages] [batch_size] [memory|sqlite]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from slack_deferral import (  # noqa: E402
+    InMemoryDeferralBackend,
+    SqliteDeferralBackend,
+    slack_defer,
+    slack_deferred_handler,
+)
+
+
+def run(total: int, batch_size: int, backend_name: str):
+    if backend_name == "sqlite":
+        backend = SqliteDeferralBackend(
+            os.path.join(tempfile.mkdtemp(), "deferral.sqlite3")
+        )
+    else:
+        backend = InMemoryDeferralBackend()
+
+    handled = []
+
+    @slack_deferred_handler(backend)
+    def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(event["event_id"])
+
+    started = time.perf_counter()
+    for n in range(total):
+        slack_defer(
+            backend,
+            "C123",
+            "U123",
+            "event",
+            {"event_id": f"Ev{n}", "event": {"type": "message", "text": "hi"}},
+        )
+    published = time.perf_counter()
+
+    backend.drain(handler, batch_size=batch_size)
+    drained = time.perf_counter()
+
+    print(
+        f"{backend_name}, {total} messages, batch size {batch_size}: "
+        f"publish {total / (published - started):.0f} msg/s, "
+        f"handle {len(handled) / (drained - published):.0f} msg/s"
+    )
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    backend_name = sys.argv[3] if len(sys.argv) > 3 else "memory"
+
+    run(total, batch_size, backend_name)
@@ -0,0 +1,128 @@
+"""
+Throughput benchmark for the Socket Mode runner.
+
+This runs a local stand-in for Slack (apps.connections.open over HTTP, plus the Socket
+Mode WebSocket server), which pushes Events API envelopes down each connection as fast
+as it can. It reports the rate at which envelopes are acked and handled. The handler
+simulates downstream I/O with a sleep.
+
+Usage: python benchmarks/socket_mode_throughput.py [messages] [connections] [workers] [handler_delay_ms]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from websockets.sync.server import serve
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from slack_socket_mode import SlackSocketModeRunner  # noqa: E402
+
+
+def stand_in(total: int):
+    acked = threading.Semaphore(0)
+    counter = iter(range(total))
+    counter_lock = threading.Lock()
+
+    def connection(websocket):
+        websocket.send(json.dumps({"type": "hello"}))
+
+        def send_envelopes():
+            while True:
+                with counter_lock:
+                    n = next(counter, None)
+                if n is None:
+                    return
+
+                websocket.send(
+                    json.dumps(
+                        {
+                            "envelope_id": f"env-{n}",
+                            "type": "events_api",
+                            "payload": {
+                                "type": "event_callback",
+                                "event_id": f"Ev{n}",
+                                "event": {"type": "message", "text": "hi"},
+                            },
+                        }
+                    )
+                )
+
+        threading.Thread(target=send_envelopes, daemon=True).start()
+
+        # read acks until the runner closes the connection
+        for _ in websocket:
+            acked.release()
+
+    ws = serve(connection, "127.0.0.1", 0)
+    ws_url = f"ws://127.0.0.1:{ws.socket.getsockname()[1]}/"
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            encoded = json.dumps({"ok": True, "url": ws_url}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, *args):
+            pass
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+    threading.Thread(target=ws.serve_forever, daemon=True).start()
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    return f"http://127.0.0.1:{http.server_address[1]}/", acked
+
+
+def run(total: int, connections: int, workers: int, handler_delay: float):
+    endpoint, acked = stand_in(total)
+    handled = threading.Semaphore(0)
+
+    def event(body):
+        if handler_delay:
+            time.sleep(handler_delay)
+        handled.release()
+
+    runner = SlackSocketModeRunner(
+        "xapp-benchmark",
+        event_func=event,
+        connections=connections,
+        max_workers=workers,
+        endpoint=endpoint,
+    )
+
+    started = time.perf_counter()
+    runner.start()
+
+    for _ in range(total):
+        acked.acquire()
+    all_acked = time.perf_counter()
+
+    for _ in range(total):
+        handled.acquire()
+    all_handled = time.perf_counter()
+
+    runner.stop()
+
+    print(
+        f"{total} envelopes, {connections} connections, {workers} workers, "
+        f"{handler_delay * 1000:.0f}ms handlers: "
+        f"acked {total / (all_acked - started):.0f} msg/s, "
+        f"handled {total / (all_handled - started):.0f} msg/s"
+    )
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    handler_delay = float(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0
+
+    run(total, connections, workers, handler_delay)
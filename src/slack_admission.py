@@ -0,0 +1,256 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+if TYPE_CHECKING:
+    from slack_deferral import DeferralBackend
+
+SLASH_COMMAND = "slash_command"
+EVENT = "event"
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: allows bursts of up to `burst`, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        """
+        :param rate: Tokens added per second.
+        :param burst: (Optional) bucket size (default: one second's worth of tokens).
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def take(self) -> bool:
+        """
+        Take a token, if one is available.
+
+        :return: True if a token was taken, False if the bucket is empty.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+
+class PriorityClass:
+    """
+    The limits for one class of requests. A request over either limit is shed.
+    """
+
+    def __init__(
+        self, max_in_flight: int = None, rate: float = None, burst: float = None
+    ):
+        """
+        :param max_in_flight: (Optional) maximum requests of this class handled at once.
+        :param rate: (Optional) maximum requests of this class per second (token bucket).
+        :param burst: (Optional) token bucket size (default: one second's worth).
+        """
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+
+
+class SlackAdmissionController:
+    """
+    Admission control and load shedding for the webhook decorators.
+
+    Each request is put into a priority class - slash commands by command name, events
+    by event type. Classes can limit how many requests are in flight at once, and the
+    rate they're admitted at. Requests over budget are shed: answered with a cheap 200
+    without running the handler or, if defer_backend is given, handed off with slack_defer
+    to be dealt with later.
+
+    The limits are per process (container). For in-flight limits to mean anything, the
+    process must handle requests concurrently (e.g. Cloud Run / Cloud Functions 2nd gen
+    with concurrency, or the ASGI / WSGI adapters).
+
+    Pass an instance as `admission` to slack_event_webhook or slack_slash_command (or
+    their provider-specific, WSGI or ASGI variants).
+    """
+
+    def __init__(
+        self,
+        classes: dict[str, PriorityClass] = None,
+        priorities: dict[str, str] = None,
+        slash_command_class: str = HIGH,
+        event_class: str = NORMAL,
+        defer_backend: "DeferralBackend" = None,
+        shed_response: dict[str, Any] = None,
+    ):
+        """
+        :param classes: (Optional) priority classes, by name (default: a limited low class - others are unlimited).
+        :param priorities: (Optional) map of command name (e.g. "/deploy") or event type (e.g. "message") to class name.
+        :param slash_command_class: (Optional) class for slash commands not in priorities.
+        :param event_class: (Optional) class for events not in priorities.
+        :param defer_backend: (Optional) backend to defer shed requests to, rather than dropping them.
+        :param shed_response: (Optional) JSON body to answer shed requests with (default: empty).
+        """
+        self.classes = (
+            dict(classes)
+            if classes is not None
+            else {LOW: PriorityClass(max_in_flight=4, rate=10, burst=20)}
+        )
+        self.priorities = priorities if priorities is not None else {"message": LOW}
+        self.slash_command_class = slash_command_class
+        self.event_class = event_class
+        self.defer_backend = defer_backend
+        self.shed_response = shed_response if shed_response is not None else {}
+
+        # any class that's referenced but not configured is unlimited
+        for name in (slash_command_class, event_class, *self.priorities.values()):
+            self.classes.setdefault(name, PriorityClass())
+
+        self._lock = threading.Lock()
+        self._in_flight = {name: 0 for name in self.classes}
+        self._stats = {
+            name: {"admitted": 0, "shed": 0, "deferred": 0} for name in self.classes
+        }
+
+    def classify(self, kind: str, payload: dict[str, Any]) -> str:
+        """
+        Get the priority class for a request.
+
+        :param kind: SLASH_COMMAND or EVENT.
+        :param payload: The parsed request payload.
+        :return: The class name.
+        """
+        if kind == SLASH_COMMAND:
+            command = payload.get("command")
+            return self.priorities.get(
+                command[0] if command else None, self.slash_command_class
+            )
+
+        event_type = (payload.get("event") or {}).get("type")
+        return self.priorities.get(event_type, self.event_class)
+
+    def call(
+        self, kind: str, payload: dict[str, Any], func: Callable[[], Any]
+    ) -> dict[str, Any]:
+        """
+        Run a handler if the request is admitted, otherwise shed it.
+
+        :param kind: SLASH_COMMAND or EVENT.
+        :param payload: The parsed request payload.
+        :param func: The handler (taking no arguments).
+        :return: The handler's response, or the shed response.
+        """
+        name = self.classify(kind, payload)
+
+        if not self._admit(name):
+            return self._shed(name, kind, payload)
+
+        try:
+            return func()
+        finally:
+            self._release(name)
+
+    async def call_async(
+        self, kind: str, payload: dict[str, Any], func: Callable[[], Awaitable[Any]]
+    ) -> dict[str, Any]:
+        """
+        Await a handler if the request is admitted, otherwise shed it. This is call, for
+        use on an event loop (e.g. by the ASGI adapters).
+
+        :param kind: SLASH_COMMAND or EVENT.
+        :param payload: The parsed request payload.
+        :param func: The handler (taking no arguments, returning an awaitable).
+        :return: The handler's response, or the shed response.
+        """
+        import asyncio
+
+        name = self.classify(kind, payload)
+
+        if not self._admit(name):
+            # deferring goes to the network, so keep it off the event loop
+            return await asyncio.to_thread(self._shed, name, kind, payload)
+
+        try:
+            return await func()
+        finally:
+            self._release(name)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get admission statistics for this process (container).
+
+        :return: A dict of counters (admitted, shed, deferred, in_flight), by class.
+        """
+        with self._lock:
+            return {
+                name: {**counters, "in_flight": self._in_flight[name]}
+                for name, counters in self._stats.items()
+            }
+
+    def _admit(self, name: str) -> bool:
+        priority = self.classes[name]
+
+        with self._lock:
+            if (
+                priority.max_in_flight is not None
+                and self._in_flight[name] >= priority.max_in_flight
+            ):
+                admitted = False
+            else:
+                admitted = priority.bucket is None or priority.bucket.take()
+
+            if admitted:
+                self._in_flight[name] += 1
+                self._stats[name]["admitted"] += 1
+            else:
+                self._stats[name]["shed"] += 1
+
+            return admitted
+
+    def _release(self, name: str):
+        with self._lock:
+            self._in_flight[name] -= 1
+
+    def _shed(self, name: str, kind: str, payload: dict[str, Any]) -> dict[str, Any]:
+        if self.defer_backend is not None and self._defer(kind, payload):
+            with self._lock:
+                self._stats[name]["deferred"] += 1
+
+        return self.shed_response
+
+    def _defer(self, kind: str, payload: dict[str, Any]) -> bool:
+        # imported here, so the webhook decorators don't pay for the deferral machinery
+        # at cold start unless they actually shed load
+        from slack_deferral import slack_defer
+
+        try:
+            if kind == SLASH_COMMAND:
+                return slack_defer(
+                    self.defer_backend,
+                    payload["response_url"][0],
+                    payload["user_id"][0],
+                    SLASH_COMMAND,
+                    payload,
+                )
+
+            event = payload.get("event") or {}
+            return slack_defer(
+                self.defer_backend,
+                event.get("channel"),
+                event.get("user"),
+                EVENT,
+                payload,
+            )
+        except (KeyError, IndexError) as e:
+            print(f"Failed to defer shed request: {e}")
+            return False
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+# Size of the shared HTTP pool (both connections and the threads that drive them)
+HTTP_POOL_SIZE = 32
+
+__lock = threading.Lock()
+__loop: asyncio.AbstractEventLoop | None = None
+__http: tuple[requests.Session, ThreadPoolExecutor] | None = None
+
+
+def slack_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop that async handlers are run on.
+
+    The loop is created on first use and runs, on its own daemon thread, for the life of
+    the process, so it (and anything bound to it) is reused across warm invocations.
+
+    :return: The event loop.
+    """
+    global __loop
+
+    with __lock:
+        if __loop is None or __loop.is_closed():
+            __loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=__loop.run_forever, name="slack-event-loop", daemon=True
+            ).start()
+
+        return __loop
+
+
+def slack_run(coroutine: Coroutine) -> Any:
+    """
+    Run a coroutine to completion on the shared event loop, and wait for the result.
+
+    This can be called from any number of threads at once (e.g. concurrent invocations),
+    but must not be called from code that's running on the shared loop itself.
+
+    :param coroutine: The coroutine to run.
+    :return: Whatever the coroutine returns.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, slack_event_loop()).result()
+
+
+async def slack_async_call(func: Callable, *args, **kwargs) -> Any:
+    """
+    Await a blocking function (e.g. any of the slack_messaging helpers) on the shared
+    HTTP worker pool, so several can overlap.
+
+    :param func: The function to call.
+    :return: Whatever the function returns.
+    """
+    _, executor = __shared_http()
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def slack_async_request(method: str, url: str, **kwargs) -> Response:
+    """
+    Make an HTTP request using the shared, pooled session, without blocking the event loop.
+
+    :param method: The HTTP method.
+    :param url: The URL.
+    :param kwargs: (Optional) further arguments for requests (json, headers, timeout, ...)
+    :return: The Response.
+    """
+    session, _ = __shared_http()
+
+    return await slack_async_call(session.request, method, url, **kwargs)
+
+
+def __shared_http() -> tuple[requests.Session, ThreadPoolExecutor]:
+    global __http
+
+    with __lock:
+        if __http is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            __http = session, ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE)
+
+        return __http
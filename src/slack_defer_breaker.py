@@ -0,0 +1,329 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+from slack_deferral import DeferralBackend, slack_envelope
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    A simple consecutive-failure circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens, and calls are refused
+    (so callers can fail fast) until reset_timeout has passed. A single trial call is then
+    let through - if it succeeds the circuit closes again, otherwise it re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30):
+        """
+        :param failure_threshold: (Optional) consecutive failures before the circuit opens.
+        :param reset_timeout: (Optional) seconds the circuit stays open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return CLOSED
+
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+
+            return OPEN
+
+    def allow(self) -> bool:
+        """
+        Determine whether a call should be attempted right now.
+
+        :return: True if the call should go ahead, False if it should fail fast.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if (
+                not self._trial_in_flight
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self._trial_in_flight = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+            self._trial_in_flight = False
+
+
+class SqliteSpool:
+    """
+    A durable, local FIFO queue of deferral envelopes, stored in SQLite.
+
+    The default location is in /tmp, which survives between warm invocations of the
+    same Lambda / Cloud Function instance (but not beyond that instance).
+    """
+
+    def __init__(self, path: str = "/tmp/slack_defer_spool.sqlite3"):
+        """
+        :param path: (Optional) path to the SQLite database file (or ":memory:").
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spool "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, envelope TEXT NOT NULL)"
+        )
+
+    def push(self, envelope: dict[str, Any]):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO spool (envelope) VALUES (?)", (json.dumps(envelope),)
+            )
+
+    def peek(self, batch_size: int) -> list[tuple[int, dict[str, Any]]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, envelope FROM spool ORDER BY id LIMIT ?", (batch_size,)
+            ).fetchall()
+
+        return [(row_id, json.loads(envelope)) for row_id, envelope in rows]
+
+    def remove(self, row_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM spool WHERE id = ?", (row_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+
+class ResilientDeferralBackend(DeferralBackend):
+    """
+    Wraps a DeferralBackend with a circuit breaker and a local spool.
+
+    Use an instance anywhere you'd use the wrapped backend (slack_defer, a
+    SlackAdmissionController's defer_backend, slack_deferred_handler and so on). Each
+    publish must complete within latency_budget (otherwise it counts as a failure), and
+    once the circuit opens, publishes fail fast. Either way, envelopes that couldn't be
+    published are written to the spool instead, and replayed in batches after later
+    (healthy) publishes. Replays run in the background, so they never add to the latency
+    of the publish that triggered them.
+
+    Note that a publish that times out may still complete in the background, so a spooled
+    envelope can occasionally be delivered twice - deferred handlers should be idempotent.
+    """
+
+    def __init__(
+        self,
+        backend: DeferralBackend,
+        breaker: CircuitBreaker = None,
+        spool: SqliteSpool = None,
+        latency_budget: float = 1.0,
+        replay_batch_size: int = 10,
+    ):
+        """
+        :param backend: The backend to wrap (e.g. an SnsDeferralBackend or PubSubDeferralBackend).
+        :param breaker: (Optional) the circuit breaker to use.
+        :param spool: (Optional) the spool to use (defaults to SQLite in /tmp).
+        :param latency_budget: (Optional) maximum seconds to wait for a single publish.
+        :param replay_batch_size: (Optional) maximum spooled envelopes replayed per batch.
+        """
+        self.backend = backend
+        self.breaker = breaker or CircuitBreaker()
+        self.spool = spool if spool is not None else SqliteSpool()
+        self._latency_budget = latency_budget
+        self._replay_batch_size = replay_batch_size
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._replaying = threading.Lock()
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        """
+        Publish an envelope through the wrapped backend, or spool it if that's not possible.
+
+        :param envelope: The envelope to publish.
+        :return: True if the envelope was published or spooled, False if neither was possible.
+        """
+        if self._publish(envelope):
+            self._replay_in_background()
+            return True
+
+        try:
+            self.spool.push(envelope)
+            return True
+        except sqlite3.Error as e:
+            print(f"Failed to spool deferred message: {e}")
+            return False
+
+    def decode(self, trigger_event: Any) -> list[tuple[dict[str, Any], str | None]]:
+        return self.backend.decode(trigger_event)
+
+    def replay(self) -> int:
+        """
+        Replay a batch of spooled envelopes, if the circuit allows.
+
+        :return: The number of envelopes successfully replayed.
+        """
+        replayed = 0
+
+        for row_id, envelope in self.spool.peek(self._replay_batch_size):
+            if not self._publish(envelope):
+                break
+
+            self.spool.remove(row_id)
+            replayed += 1
+
+        return replayed
+
+    def _replay_in_background(self):
+        # one replay at a time is plenty - and stops envelopes being replayed twice
+        if not self._replaying.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.replay()
+            except Exception as e:
+                print(f"Failed to replay spooled messages: {e}")
+            finally:
+                self._replaying.release()
+
+        self._executor.submit(run)
+
+    def _publish(self, envelope: dict[str, Any]) -> bool:
+        if not self.breaker.allow():
+            return False
+
+        future = self._executor.submit(self.backend.publish, envelope)
+
+        try:
+            ok = future.result(timeout=self._latency_budget)
+        except FutureTimeoutError:
+            ok = False
+        except Exception as e:
+            print(f"Deferred publish failed: {e}")
+            ok = False
+
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+        return ok
+
+
+class ResilientDefer:
+    """
+    Wraps one of the slack_defer_<provider> functions with a circuit breaker and a local spool.
+
+    This is a ResilientDeferralBackend for the older (publisher, topic, ...) defer functions -
+    use an instance exactly as you would the wrapped function. Replays use the publisher
+    from the most recent call. New code should wrap a DeferralBackend instead.
+    """
+
+    def __init__(
+        self,
+        defer_func: Callable[..., bool],
+        breaker: CircuitBreaker = None,
+        spool: SqliteSpool = None,
+        latency_budget: float = 1.0,
+        replay_batch_size: int = 10,
+    ):
+        """
+        :param defer_func: The function to wrap (e.g. slack_defer_aws or slack_defer_gcp).
+        :param breaker: (Optional) the circuit breaker to use.
+        :param spool: (Optional) the spool to use (defaults to SQLite in /tmp).
+        :param latency_budget: (Optional) maximum seconds to wait for a single publish.
+        :param replay_batch_size: (Optional) maximum spooled envelopes replayed per batch.
+        """
+        self._target = _DeferFuncBackend(defer_func)
+        self.backend = ResilientDeferralBackend(
+            self._target, breaker, spool, latency_budget, replay_batch_size
+        )
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self.backend.breaker
+
+    @property
+    def spool(self) -> SqliteSpool:
+        return self.backend.spool
+
+    def __call__(
+        self,
+        publisher: Any,
+        topic: str,
+        response_target: str,
+        user_id: str,
+        interaction_type: str,
+        event: dict[Any, Any],
+        data: dict[Any, Any] = None,
+    ) -> bool:
+        """
+        Defer processing of a Slack message, as the wrapped function.
+
+        :return: True if the message was published or spooled, False if neither was possible.
+        """
+        self._target.publisher = publisher
+
+        # the topic travels with the envelope, so spooled envelopes replay to the right place
+        return self.backend.publish(
+            {
+                **slack_envelope(
+                    response_target, user_id, interaction_type, event, data
+                ),
+                "topic": topic,
+            }
+        )
+
+    def replay(self, publisher: Any) -> int:
+        """
+        Replay a batch of spooled envelopes, if the circuit allows.
+
+        :param publisher: The publisher to use.
+        :return: The number of envelopes successfully replayed.
+        """
+        self._target.publisher = publisher
+        return self.backend.replay()
+
+
+class _DeferFuncBackend(DeferralBackend):
+    # Adapts a slack_defer_<provider> function to a (publish-only) DeferralBackend
+    def __init__(self, defer_func: Callable[..., bool]):
+        self.defer_func = defer_func
+        self.publisher = None
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        return self.defer_func(
+            self.publisher,
+            envelope["topic"],
+            envelope["response_target"],
+            envelope["user_id"],
+            envelope["interaction_type"],
+            envelope["event"],
+            envelope["data"],
+        )
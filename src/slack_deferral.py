@@ -0,0 +1,484 @@
+import asyncio
+import base64
+import functools
+import inspect
+import itertools
+import json
+import threading
+from typing import Any, Callable, Coroutine, Iterable
+
+from slack_async import slack_async_call, slack_run
+from slack_idempotency import (
+    ProcessedMessageStore,
+    SlackMessageInProgressError,
+    slack_idempotency_key,
+)
+from slack_profiling import SlackProfiler
+from slack_serverless import slack_run_init_hooks
+
+# Trigger event key used by the local backends when handing a batch to a deferred handler
+LOCAL_BATCH_KEY = "slack_deferred_batch"
+
+__ENVELOPE_KEYS = ("response_target", "user_id", "interaction_type", "event")
+
+
+class DeferralBackend:
+    """
+    Base class for the queues / brokers that deferred Slack messages are passed through.
+
+    A backend knows how to publish an envelope (see slack_envelope), and how to decode the
+    envelopes from the event that triggers the deferred function. Subclasses must
+    implement both.
+    """
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        """
+        Publish an envelope for deferred processing.
+
+        :param envelope: The envelope to publish.
+        :return: True if successful, False otherwise.
+        """
+        raise NotImplementedError
+
+    def decode(self, trigger_event: Any) -> list[tuple[dict[str, Any], str | None]]:
+        """
+        Decode the envelopes from the event that triggered the deferred function.
+
+        :param trigger_event: The trigger event.
+        :return: A list of (envelope, message ID) tuples. The message ID may be None.
+        :raises KeyError: if the trigger event is malformed.
+        """
+        raise NotImplementedError
+
+
+class SnsDeferralBackend(DeferralBackend):
+    """
+    Publishes to an (FIFO) SNS topic, and decodes SQS-triggered Lambda events.
+    """
+
+    def __init__(self, client: Any = None, topic_arn: str = None):
+        """
+        :param client: The boto3 SNS client (only needed for publishing).
+        :param topic_arn: The topic ARN (only needed for publishing).
+        """
+        self.client = client
+        self.topic_arn = topic_arn
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        from botocore.exceptions import ClientError
+
+        if envelope["interaction_type"].startswith("slash") or (
+            "event_id" not in envelope["event"]
+        ):
+            # for slash commands, use unique response URL as the dedup key
+            dedup_id = envelope["response_target"]
+        else:
+            # for events, use the event ID as the dedup key
+            dedup_id = envelope["event"]["event_id"]
+
+        try:
+            self.client.publish(
+                TopicArn=self.topic_arn,
+                MessageGroupId="slack_deferred",
+                MessageDeduplicationId=dedup_id,
+                Message=json.dumps(envelope),
+            )
+
+            return True
+        except ClientError as e:
+            print(e)
+            return False
+
+    def decode(self, trigger_event: Any) -> list[tuple[dict[str, Any], str | None]]:
+        return [
+            (
+                json.loads(json.loads(record["body"])["Message"]),
+                record.get("messageId"),
+            )
+            for record in trigger_event["Records"]
+        ]
+
+
+class PubSubDeferralBackend(DeferralBackend):
+    """
+    Publishes to a Cloud PubSub topic, and decodes PubSub-triggered Cloud Function events
+    (background function events, CloudEvents and push subscription bodies).
+    """
+
+    def __init__(self, publisher: Any = None, topic: str = None, timeout: float = 30):
+        """
+        :param publisher: The GCP PublisherClient (only needed for publishing).
+        :param topic: The topic name (only needed for publishing).
+        :param timeout: (Optional) seconds to wait for a publish to complete.
+        """
+        self.publisher = publisher
+        self.topic = topic
+        self.timeout = timeout
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        from concurrent.futures import (
+            CancelledError,
+            TimeoutError as FutureTimeoutError,
+        )
+
+        from google.cloud.pubsub_v1.publisher.exceptions import MessageTooLargeError
+
+        try:
+            self.publisher.publish(
+                self.topic,
+                json.dumps(envelope).encode("utf-8"),
+                timeout=min(20, self.timeout),
+            ).result(self.timeout)
+
+            return True
+        except (FutureTimeoutError, CancelledError, MessageTooLargeError):
+            return False
+
+    def decode(self, trigger_event: Any) -> list[tuple[dict[str, Any], str | None]]:
+        if not isinstance(trigger_event, dict):
+            # CloudEvent
+            message = trigger_event.data["message"]
+        elif "message" in trigger_event:
+            # push subscription body
+            message = trigger_event["message"]
+        else:
+            # background function event
+            message = trigger_event
+
+        return [
+            (
+                json.loads(base64.b64decode(message["data"]).decode("utf-8")),
+                message.get("messageId") or message.get("message_id"),
+            )
+        ]
+
+
+class LocalDeferralBackend(DeferralBackend):
+    """
+    Base class for backends that queue envelopes locally, for running (and benchmarking)
+    the whole deferral pipeline on a laptop or in CI.
+
+    Use `drain` to feed queued envelopes, in batches, to a function decorated with
+    slack_deferred_handler.
+    """
+
+    def decode(self, trigger_event: Any) -> list[tuple[dict[str, Any], str | None]]:
+        return [
+            (item["envelope"], str(item["id"]))
+            for item in trigger_event[LOCAL_BATCH_KEY]
+        ]
+
+    def drain(
+        self,
+        handler: Callable[[Any], Any],
+        batch_size: int = 10,
+        max_batches: int = None,
+    ) -> int:
+        """
+        Pass queued envelopes, in batches, to a deferred handler. Envelopes are removed
+        from the queue once the handler returns.
+
+        :param handler: A function decorated with slack_deferred_handler (using this backend).
+        :param batch_size: (Optional) maximum envelopes per batch.
+        :param max_batches: (Optional) stop after this many batches (default: until empty).
+        :return: The number of envelopes handled.
+        """
+        handled = 0
+
+        for _ in itertools.count() if max_batches is None else range(max_batches):
+            batch = self._peek(batch_size)
+            if not batch:
+                break
+
+            handler(
+                {
+                    LOCAL_BATCH_KEY: [
+                        {"id": row_id, "envelope": envelope}
+                        for row_id, envelope in batch
+                    ]
+                }
+            )
+
+            for row_id, _ in batch:
+                self._remove(row_id)
+
+            handled += len(batch)
+
+        return handled
+
+    def _peek(self, batch_size: int) -> list[tuple[int, dict[str, Any]]]:
+        raise NotImplementedError
+
+    def _remove(self, row_id: int):
+        raise NotImplementedError
+
+
+class InMemoryDeferralBackend(LocalDeferralBackend):
+    """
+    Queues envelopes in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._queue: dict[int, dict[str, Any]] = {}
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        # round-trip through JSON, as a real broker would
+        encoded = json.loads(json.dumps(envelope))
+
+        with self._lock:
+            self._queue[next(self._ids)] = encoded
+
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def _peek(self, batch_size: int) -> list[tuple[int, dict[str, Any]]]:
+        with self._lock:
+            return list(itertools.islice(self._queue.items(), batch_size))
+
+    def _remove(self, row_id: int):
+        with self._lock:
+            self._queue.pop(row_id, None)
+
+
+class SqliteDeferralBackend(LocalDeferralBackend):
+    """
+    Queues envelopes durably, in SQLite.
+    """
+
+    def __init__(self, path: str = "/tmp/slack_deferral.sqlite3"):
+        """
+        :param path: (Optional) path to the SQLite database file (or ":memory:").
+        """
+        # imported here, as slack_defer_breaker builds on this module
+        from slack_defer_breaker import SqliteSpool
+
+        self._spool = SqliteSpool(path)
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        self._spool.push(envelope)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._spool)
+
+    def _peek(self, batch_size: int) -> list[tuple[int, dict[str, Any]]]:
+        return self._spool.peek(batch_size)
+
+    def _remove(self, row_id: int):
+        self._spool.remove(row_id)
+
+
+def slack_envelope(
+    response_target: str,
+    user_id: str,
+    interaction_type: str,
+    event: dict[Any, Any],
+    data: dict[Any, Any] = None,
+) -> dict[str, Any]:
+    """
+    Build the envelope that carries a deferred Slack message through a DeferralBackend.
+
+    :param response_target: The response target (URL or channel) for this Slack interaction.
+    :param user_id: The Slack user ID.
+    :param interaction_type: The interaction type (currently, "event" or "slash_command")
+    :param event: Original event data to pass to the deferred processor
+    :param data: Extra data you want to pass to the deferred processor (optional)
+    :return: The envelope.
+    """
+    return {
+        "response_target": response_target,
+        "user_id": user_id,
+        "interaction_type": interaction_type,
+        "event": event,
+        "data": data or {},
+    }
+
+
+def slack_defer(
+    backend: DeferralBackend,
+    response_target: str,
+    user_id: str,
+    interaction_type: str,
+    event: dict[Any, Any],
+    data: dict[Any, Any] = None,
+) -> bool:
+    """
+    Defer processing of a Slack message by publishing it through the given backend.
+
+    :param backend: The deferral backend.
+    :param response_target: The response target (URL or channel) for this Slack interaction.
+    :param user_id: The Slack user ID.
+    :param interaction_type: The interaction type (currently, "event" or "slash_command")
+    :param event: Original event data to pass to the deferred processor
+    :param data: Extra data you want to pass to the deferred processor (optional)
+    :return: True if successful, False otherwise.
+    """
+    return backend.publish(
+        slack_envelope(response_target, user_id, interaction_type, event, data)
+    )
+
+
+def slack_deferred_handler(
+    backend: DeferralBackend,
+    profiler: SlackProfiler = None,
+    store: ProcessedMessageStore = None,
+    lease: float = 300,
+    init_hooks: Iterable[Callable[[], Any]] = (),
+):
+    """
+    Decorate a function as a handler for Slack messages deferred with slack_defer.
+
+    Functions decorated by this should accept the response_target, user_id, interaction_type,
+    original event and extra data from the deferred message (plus any further arguments
+    your platform passes to the handler). The decorated function is called once for each
+    message in the triggering event.
+
+    The decorated function may be an `async def` function, in which case it is run on a
+    shared event loop that persists across warm invocations (see slack_async.py), and the
+    messages in a batch are handled concurrently.
+
+    If a store is given, each message is claimed in it (by slack_idempotency_key) just before
+    the decorated function is called for it, and messages that have already been processed
+    are skipped. If the decorated function raises, the claim is released so that the
+    redelivered message will be processed. Messages that are still being processed elsewhere
+    are also left unacknowledged: once the rest of the batch is done, a
+    SlackMessageInProgressError is raised so that the broker redelivers them later.
+
+    :param backend: The deferral backend the messages were published through.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :param store: (Optional) a ProcessedMessageStore to de-duplicate messages with.
+    :param lease: (Optional) seconds a claim is held for - longer than the function can run.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :return: The decorated function. This is suitable for direct use as the deferred function handler.
+    """
+    slack_run_init_hooks(init_hooks)
+
+    def decorator(
+        base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], Any]
+    ):
+        is_async = inspect.iscoroutinefunction(base_func)
+
+        def handler(trigger_event: Any, *rest, **kwargs):
+            try:
+                messages = backend.decode(trigger_event)
+            except (KeyError, TypeError, ValueError):
+                print("Received apparently-malformed message: " + str(trigger_event))
+                return
+
+            calls = []
+            for envelope, message_id in messages:
+                if not all(key in envelope for key in __ENVELOPE_KEYS):
+                    print("Received apparently-malformed message: " + str(envelope))
+                    continue
+
+                key = None
+                if store is not None:
+                    key = slack_idempotency_key(envelope, message_id)
+
+                calls.append(
+                    (
+                        key,
+                        functools.partial(
+                            base_func,
+                            envelope["response_target"],
+                            envelope["user_id"],
+                            envelope["interaction_type"],
+                            envelope["event"],
+                            envelope.get("data", {}),
+                            *rest,
+                            **kwargs,
+                        ),
+                    )
+                )
+
+            in_progress = []
+
+            if is_async:
+                # all the messages in the batch are handled concurrently
+                claimed = [
+                    (key, call)
+                    for key, call in calls
+                    if __claim(store, key, lease, in_progress)
+                ]
+                slack_run(__gather(store, claimed))
+            else:
+                # claimed one at a time, so a failure leaves the rest of the batch unclaimed
+                for key, call in calls:
+                    if __claim(store, key, lease, in_progress):
+                        __run_claimed(store, key, call)
+
+            if in_progress:
+                raise SlackMessageInProgressError(in_progress)
+
+        return handler if profiler is None else profiler.wrap(handler)
+
+    return decorator
+
+
+def __claim(
+    store: ProcessedMessageStore | None,
+    key: str | None,
+    lease: float,
+    in_progress: list[str],
+) -> bool:
+    if key is None or store.claim(key, lease):
+        return True
+
+    if store.is_complete(key):
+        print(f"Skipping already-processed message: {key}")
+    else:
+        in_progress.append(key)
+
+    return False
+
+
+def __run_claimed(store: ProcessedMessageStore | None, key: str | None, call: Callable):
+    try:
+        result = call()
+    except BaseException:
+        if key is not None:
+            store.release(key)
+        raise
+
+    if key is not None:
+        store.complete(key)
+
+    return result
+
+
+async def __gather(
+    store: ProcessedMessageStore | None,
+    calls: list[tuple[str | None, Callable[[], Coroutine]]],
+):
+    results = await asyncio.gather(
+        *(__run_claimed_async(store, key, call) for key, call in calls),
+        return_exceptions=True,
+    )
+
+    # every message gets to finish (and settle its claim) before the first failure is raised
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def __run_claimed_async(
+    store: ProcessedMessageStore | None, key: str | None, call: Callable[[], Coroutine]
+):
+    # stores go to the network (or a locked SQLite write), so settle claims on the
+    # worker pool rather than stalling everything else on the shared loop
+    try:
+        result = await call()
+    except BaseException:
+        if key is not None:
+            await slack_async_call(store.release, key)
+        raise
+
+    if key is not None:
+        await slack_async_call(store.complete, key)
+
+    return result
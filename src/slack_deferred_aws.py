@@ -1,10 +1,11 @@
-import json
-from typing import Callable, Any
+from typing import Any, Callable, Iterable
 
-import requests
 from requests import Response
 
-from botocore.exceptions import ClientError
+from slack_deferral import SnsDeferralBackend, slack_defer, slack_deferred_handler
+from slack_messaging import slack_response_url_post
+from slack_idempotency import ProcessedMessageStore
+from slack_profiling import SlackProfiler
 
 
 def slack_defer_aws(
@@ -28,40 +29,22 @@ def slack_defer_aws(
     :param data: Extra data you want to pass to the deferred processor (optional)
     :return: True if successful, False otherwise.
     """
-    if data is None:
-        data = {}
-
-    if interaction_type == "slash":
-        # for slash commands, use unique response URL as the dedup key
-        dedup_id = "".join(response_target)
-    else:
-        # for events, use the event ID as the dedup key
-        dedup_id = event["event_id"]
-
-    try:
-        publisher.publish(
-            TopicArn=topic_arn,
-            MessageGroupId="slack_deferred",
-            MessageDeduplicationId=dedup_id,
-            Message=json.dumps(
-                {
-                    "response_target": response_target,
-                    "user_id": user_id,
-                    "interaction_type": interaction_type,
-                    "event": event,
-                    "data": data,
-                }
-            ),
-        )
-
-        return True
-    except ClientError as e:
-        print(e)
-        return False
+    return slack_defer(
+        SnsDeferralBackend(publisher, topic_arn),
+        response_target,
+        user_id,
+        interaction_type,
+        event,
+        data,
+    )
 
 
 def slack_deferred_slash_handler_aws(
-    base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], None]
+    base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], None] = None,
+    profiler: SlackProfiler = None,
+    store: ProcessedMessageStore = None,
+    lease: float = 300,
+    init_hooks: Iterable[Callable[[], Any]] = (),
 ):
     """
     Decorator that can be applied to an AWS Lambda function to make the handling of deferred
@@ -75,54 +58,36 @@ def slack_deferred_slash_handler_aws(
     function can be used (or you can just do a POST to the given response_url in your
     own code if you like full control).
 
+    The decorated function may be an `async def` function - see slack_deferred_handler.
+
+    It can be applied directly, or called with options first
+    (e.g. `@slack_deferred_slash_handler_aws(profiler=...)`).
+
     :param base_func: The function to decorate.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :param store: (Optional) a ProcessedMessageStore to skip redelivered messages with - see slack_deferred_handler.
+    :param lease: (Optional) seconds a message's claim in the store is held for.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
     :return: The decorated function. This is suitable for direct use as a GCP event triggered function.
     """
+    decorator = slack_deferred_handler(
+        SnsDeferralBackend(), profiler, store, lease, init_hooks
+    )
+    return decorator if base_func is None else decorator(base_func)
 
-    def handler(event: dict[str, Any], *rest, **kwargs):
-        try:
-            (
-                response_target,
-                user_id,
-                interaction_type,
-                original_event,
-                data,
-            ) = __decode_payload(event)
-            base_func(
-                response_target,
-                user_id,
-                interaction_type,
-                original_event,
-                data,
-                *rest,
-                **kwargs,
-            )
-        except KeyError:
-            print("Received apparently-malformed message: " + str(event))
-
-    return handler
-
-
-def slack_deferred_response(response_url: str, content: dict[str, Any]) -> Response:
+
+def slack_deferred_response(
+    response_url: str, content: dict[str, Any], **kwargs
+) -> Response | None:
     """
     Post a response back to Slack for a deferred message.
 
+    Timeouts, retries (with backoff) and tracking of the response_url's limited uses are
+    handled by slack_response_url_post - any keyword arguments are passed through to it.
+
     :param response_url: The Slack response URL from the original message.
     :param content: The message content (in Slack response format - see slack_messaging.py)
-    :return: The result of the POST request (a Response object)
+    :param kwargs: (Optional) timeout and retry options - see slack_response_url_post.
+    :return: The result of the POST request (a Response object), or None if the response_url is used up.
     """
-    return requests.post(response_url, json=content)
-
-
-def __decode_payload(
-    event: dict[str, Any]
-) -> tuple[str, str, str, dict[str, Any], dict[str, Any]]:
-    body = json.loads(event["Records"][0]["body"])
-    data = json.loads(body["Message"])
-    return (
-        data["response_target"],
-        data["user_id"],
-        data["interaction_type"],
-        data["event"],
-        data.get("data", {}),
-    )
+    return slack_response_url_post(response_url, content, **kwargs)
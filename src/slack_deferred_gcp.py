@@ -1,13 +1,13 @@
-import base64
-import json
-from concurrent.futures import CancelledError
-from typing import Callable, Any
+from typing import Any, Callable, Iterable
 
-import requests
 from google.cloud.pubsub_v1 import PublisherClient
-from google.cloud.pubsub_v1.publisher.exceptions import MessageTooLargeError
 from requests import Response
 
+from slack_deferral import PubSubDeferralBackend, slack_defer, slack_deferred_handler
+from slack_messaging import slack_response_url_post
+from slack_idempotency import ProcessedMessageStore
+from slack_profiling import SlackProfiler
+
 
 def slack_defer_gcp(
     publisher: PublisherClient,
@@ -30,31 +30,22 @@ def slack_defer_gcp(
     :param data: Extra data you want to pass to the deferred processor (optional)
     :return: True if successful, False otherwise.
     """
-    if data is None:
-        data = {}
-
-    try:
-        publisher.publish(
-            topic,
-            json.dumps(
-                {
-                    "response_target": response_target,
-                    "user_id": user_id,
-                    "interaction_type": interaction_type,
-                    "event": event,
-                    "data": data,
-                }
-            ).encode("utf-8"),
-            timeout=20,
-        ).result(30)
-
-        return True
-    except TimeoutError | CancelledError | MessageTooLargeError:
-        return False
+    return slack_defer(
+        PubSubDeferralBackend(publisher, topic),
+        response_target,
+        user_id,
+        interaction_type,
+        event,
+        data,
+    )
 
 
 def slack_deferred_slash_handler_gcp(
-    base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], None]
+    base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], None] = None,
+    profiler: SlackProfiler = None,
+    store: ProcessedMessageStore = None,
+    lease: float = 300,
+    init_hooks: Iterable[Callable[[], Any]] = (),
 ):
     """
     Decorator that can be applied to a Google cloud function to make the handling of deferred
@@ -68,45 +59,47 @@ def slack_deferred_slash_handler_gcp(
     function can be used (or you can just do a POST to the given response_url in your
     own code if you like full control).
 
+    The decorated function may be an `async def` function - see slack_deferred_handler.
+
+    It can be applied directly, or called with options first
+    (e.g. `@slack_deferred_slash_handler_gcp(profiler=...)`).
+
     :param base_func: The function to decorate.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :param store: (Optional) a ProcessedMessageStore to skip redelivered messages with - see slack_deferred_handler.
+    :param lease: (Optional) seconds a message's claim in the store is held for.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
     :return: The decorated function. This is suitable for direct use as a GCP event triggered function.
     """
 
-    def handler(event: dict[str, Any], *rest):
-        try:
-            (
-                response_target,
-                user_id,
-                interaction_type,
-                original_event,
-                data,
-            ) = __decode_payload(event)
-            base_func(response_target, user_id, interaction_type, original_event, data)
-        except KeyError:
-            print("Received apparently-malformed message: " + str(event))
+    def decorator(
+        base_func: Callable[[str, str, str, dict[str, Any], dict[str, Any]], None]
+    ):
+        deferred_handler = slack_deferred_handler(
+            PubSubDeferralBackend(), profiler, store, lease, init_hooks
+        )(base_func)
 
-    return handler
+        def handler(event: dict[str, Any], *rest):
+            # GCP passes a context, which the decorated function doesn't expect
+            deferred_handler(event)
 
+        return handler
 
-def slack_deferred_response(response_url: str, content: dict[str, Any]) -> Response:
+    return decorator if base_func is None else decorator(base_func)
+
+
+def slack_deferred_response(
+    response_url: str, content: dict[str, Any], **kwargs
+) -> Response | None:
     """
     Post a response back to Slack for a deferred message.
 
+    Timeouts, retries (with backoff) and tracking of the response_url's limited uses are
+    handled by slack_response_url_post - any keyword arguments are passed through to it.
+
     :param response_url: The Slack response URL from the original message.
     :param content: The message content (in Slack response format - see slack_messaging.py)
-    :return: The result of the POST request (a Response object)
+    :param kwargs: (Optional) timeout and retry options - see slack_response_url_post.
+    :return: The result of the POST request (a Response object), or None if the response_url is used up.
     """
-    return requests.post(response_url, json=content)
-
-
-def __decode_payload(
-    event: dict[str, Any]
-) -> tuple[str, str, str, dict[str, Any], dict[str, Any]]:
-    data = json.loads(base64.b64decode(event["data"]).decode("utf-8"))
-    return (
-        data["response_target"],
-        data["user_id"],
-        data["interaction_type"],
-        data["event"],
-        data.get("data", {}),
-    )
+    return slack_response_url_post(response_url, content, **kwargs)
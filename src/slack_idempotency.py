@@ -0,0 +1,346 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+CLAIMED = "claimed"
+DONE = "done"
+
+
+class SlackMessageInProgressError(Exception):
+    """
+    Raised by a deferred handler when messages in the batch are still being processed
+    elsewhere (their claim is leased, but not yet complete). Failing the invocation makes
+    the broker redeliver them later, rather than acknowledging messages that may never
+    be completed.
+    """
+
+    def __init__(self, keys: list[str]):
+        super().__init__(f"Messages still in progress elsewhere: {keys}")
+        self.keys = keys
+
+
+class ProcessedMessageStore:
+    """
+    Base class for the stores that deferred handlers use to recognise (and skip) messages
+    they've already processed - SQS and PubSub both deliver at least once.
+
+    A message is first claimed, with a lease. While the lease is held (or once the message
+    is complete) further claims fail. If the worker dies mid-way, the lease eventually
+    expires and the message can be claimed again. Completed messages are remembered for
+    the store's retention period. Subclasses must implement claim, complete and release.
+    """
+
+    def claim(self, key: str, lease: float) -> bool:
+        """
+        Claim a message for processing.
+
+        :param key: The idempotency key (see slack_idempotency_key).
+        :param lease: Seconds the claim is held for.
+        :return: True if the message should be processed, False if it's a duplicate.
+        """
+        raise NotImplementedError
+
+    def is_complete(self, key: str) -> bool:
+        """
+        Determine whether a message has been processed (as opposed to just claimed).
+
+        :param key: The idempotency key.
+        :return: True if the message is complete, False otherwise.
+        """
+        raise NotImplementedError
+
+    def complete(self, key: str):
+        """
+        Mark a claimed message as processed.
+
+        :param key: The idempotency key.
+        """
+        raise NotImplementedError
+
+    def release(self, key: str):
+        """
+        Give up a claim (e.g. because processing failed), so a redelivery can be processed.
+
+        :param key: The idempotency key.
+        """
+        raise NotImplementedError
+
+
+class InMemoryProcessedMessageStore(ProcessedMessageStore):
+    """
+    Remembers processed messages in memory, evicting the least recently seen.
+
+    This only catches duplicates delivered to the same (warm) container.
+    """
+
+    def __init__(self, max_entries: int = 10000, retention: float = 24 * 60 * 60):
+        """
+        :param max_entries: (Optional) maximum number of keys remembered.
+        :param retention: (Optional) seconds to remember a completed message for.
+        """
+        self.max_entries = max_entries
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def claim(self, key: str, lease: float) -> bool:
+        now = time.time()
+
+        with self._lock:
+            _, expires_at = self._entries.get(key, (None, None))
+
+            if expires_at is not None and expires_at > now:
+                self._entries.move_to_end(key)
+                return False
+
+            self._remember(key, CLAIMED, now + lease)
+            return True
+
+    def is_complete(self, key: str) -> bool:
+        with self._lock:
+            state, expires_at = self._entries.get(key, (None, None))
+
+            return state == DONE and expires_at > time.time()
+
+    def complete(self, key: str):
+        with self._lock:
+            self._remember(key, DONE, time.time() + self.retention)
+
+    def release(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _remember(self, key: str, state: str, expires_at: float):
+        self._entries[key] = (state, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SqliteProcessedMessageStore(ProcessedMessageStore):
+    """
+    Remembers processed messages in SQLite.
+
+    The default location is in /tmp, which survives between warm invocations of the
+    same Lambda / Cloud Function instance (but not beyond that instance).
+    """
+
+    def __init__(
+        self,
+        path: str = "/tmp/slack_processed.sqlite3",
+        retention: float = 24 * 60 * 60,
+    ):
+        """
+        :param path: (Optional) path to the SQLite database file (or ":memory:").
+        :param retention: (Optional) seconds to remember a completed message for.
+        """
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS processed "
+            "(key TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def claim(self, key: str, lease: float) -> bool:
+        now = time.time()
+
+        with self._lock:
+            # only takes over an existing row once its lease (or retention) has expired
+            cursor = self._db.execute(
+                "INSERT INTO processed (key, state, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "state = excluded.state, expires_at = excluded.expires_at "
+                "WHERE processed.expires_at <= ?",
+                (key, CLAIMED, now + lease, now),
+            )
+
+            return cursor.rowcount == 1
+
+    def is_complete(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM processed WHERE key = ? AND state = ? AND expires_at > ?",
+                (key, DONE, time.time()),
+            ).fetchone()
+
+        return row is not None
+
+    def complete(self, key: str):
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE processed SET state = ?, expires_at = ? WHERE key = ?",
+                (DONE, now + self.retention, key),
+            )
+            self._db.execute("DELETE FROM processed WHERE expires_at <= ?", (now,))
+
+    def release(self, key: str):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM processed WHERE key = ? AND state = ?", (key, CLAIMED)
+            )
+
+
+class DynamoDbProcessedMessageStore(ProcessedMessageStore):
+    """
+    Remembers processed messages in a DynamoDB table, shared by every instance.
+
+    The table needs a string partition key (named key_attribute). Enable DynamoDB TTL on
+    the `expires_at` attribute to have expired entries cleaned up.
+    """
+
+    def __init__(
+        self,
+        table: Any,
+        key_attribute: str = "message_key",
+        retention: float = 24 * 60 * 60,
+    ):
+        """
+        :param table: The boto3 DynamoDB Table resource.
+        :param key_attribute: (Optional) name of the table's partition key.
+        :param retention: (Optional) seconds to remember a completed message for.
+        """
+        self.table = table
+        self.key_attribute = key_attribute
+        self.retention = retention
+
+    def claim(self, key: str, lease: float) -> bool:
+        now = time.time()
+
+        try:
+            self.table.put_item(
+                Item=self._item(key, CLAIMED, now + lease),
+                ConditionExpression="attribute_not_exists(#key) OR expires_at <= :now",
+                ExpressionAttributeNames={"#key": self.key_attribute},
+                ExpressionAttributeValues={":now": int(now)},
+            )
+            return True
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def is_complete(self, key: str) -> bool:
+        item = self.table.get_item(
+            Key={self.key_attribute: key}, ConsistentRead=True
+        ).get("Item")
+
+        return (
+            item is not None
+            and item["state"] == DONE
+            and item["expires_at"] > time.time()
+        )
+
+    def complete(self, key: str):
+        self.table.put_item(Item=self._item(key, DONE, time.time() + self.retention))
+
+    def release(self, key: str):
+        self.table.delete_item(Key={self.key_attribute: key})
+
+    def _item(self, key: str, state: str, expires_at: float) -> dict[str, Any]:
+        # DynamoDB TTL (and the boto3 resource API) want whole epoch seconds
+        return {self.key_attribute: key, "state": state, "expires_at": int(expires_at)}
+
+
+class FirestoreProcessedMessageStore(ProcessedMessageStore):
+    """
+    Remembers processed messages in a Firestore collection, shared by every instance.
+
+    Configure a Firestore TTL policy on the `expires_at` field to have expired entries
+    cleaned up.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        collection: str = "slack_processed_messages",
+        retention: float = 24 * 60 * 60,
+    ):
+        """
+        :param client: The google.cloud.firestore Client.
+        :param collection: (Optional) the collection to store entries in.
+        :param retention: (Optional) seconds to remember a completed message for.
+        """
+        self.client = client
+        self.collection = collection
+        self.retention = retention
+
+    def claim(self, key: str, lease: float) -> bool:
+        from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+
+        now = datetime.now(timezone.utc)
+        document = self._document(key)
+        entry = {"state": CLAIMED, "expires_at": now + timedelta(seconds=lease)}
+
+        snapshot = document.get()
+        if not snapshot.exists:
+            try:
+                document.create(entry)
+                return True
+            except AlreadyExists:
+                return False
+
+        if snapshot.to_dict()["expires_at"] > now:
+            return False
+
+        # take over the expired entry, unless someone else got there first
+        try:
+            document.update(
+                entry,
+                option=self.client.write_option(last_update_time=snapshot.update_time),
+            )
+            return True
+        except FailedPrecondition:
+            return False
+
+    def is_complete(self, key: str) -> bool:
+        snapshot = self._document(key).get()
+        if not snapshot.exists:
+            return False
+
+        entry = snapshot.to_dict()
+        return entry["state"] == DONE and entry["expires_at"] > datetime.now(
+            timezone.utc
+        )
+
+    def complete(self, key: str):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.retention)
+
+        self._document(key).set({"state": DONE, "expires_at": expires_at})
+
+    def release(self, key: str):
+        self._document(key).delete()
+
+    def _document(self, key: str) -> Any:
+        # keys are often URLs, which aren't valid document IDs
+        return self.client.collection(self.collection).document(
+            hashlib.sha256(key.encode()).hexdigest()
+        )
+
+
+def slack_idempotency_key(
+    envelope: dict[str, Any], message_id: str = None
+) -> str | None:
+    """
+    Get the key that identifies a deferred message, for de-duplication.
+
+    For slash commands this is the (unique) response URL, for events the event ID, and
+    otherwise the broker's message ID.
+
+    :param envelope: The deferred message envelope (see slack_envelope).
+    :param message_id: (Optional) the broker's message ID.
+    :return: The key, or None if there's nothing to identify the message by.
+    """
+    if envelope["interaction_type"].startswith("slash"):
+        return envelope["response_target"]
+
+    event = envelope["event"]
+    if isinstance(event, dict) and "event_id" in event:
+        return event["event_id"]
+
+    return message_id
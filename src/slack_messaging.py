@@ -1,13 +1,44 @@
-from typing import Any
+import contextlib
+import json
+import mmap
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
 
 import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from slack_secrets import SlackSecretProvider, slack_secret_value, slack_secret_refresh
 
 EPHEMERAL = "ephemeral"
 IN_CHANNEL = "in_channel"
 
+MAX_BLOCKS_PER_MESSAGE = 50
+MAX_SECTION_TEXT_LENGTH = 3000
+
+# Slack allows each response_url to be used five times within thirty minutes
+RESPONSE_URL_MAX_USES = 5
+RESPONSE_URL_LIFETIME = 30 * 60
+
+# Minimum seconds between calls for each Web API rate limit tier
+RATE_LIMIT_TIER_INTERVALS = {1: 60.0, 2: 3.0, 3: 1.2, 4: 0.6}
+
+# Shared across invocations of a warm function, so connections to Slack are reused
+__session = requests.Session()
+# big enough for the shared async worker pool (see slack_async.py) to overlap calls
+__session.mount("https://", HTTPAdapter(pool_maxsize=32))
+
+__response_url_uses: dict[str, tuple[int, float]] = {}
+__response_url_lock = threading.Lock()
+
 
 def slack_post_message(
-    slack_access_token: str,
+    slack_access_token: str | SlackSecretProvider,
     channel: str,
     message: dict[str, Any],
     endpoint: str = "https://slack.com/api/chat.postMessage",
@@ -15,23 +46,21 @@ def slack_post_message(
     """
     Post an immediate message to slack with any parameters.
 
-    :param slack_access_token: The bot access token (from your Slack app settings).
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
     :param channel: The channel to post to.
     :param message: Message parameters for Slack (should include at least 'text' or 'blocks'!)
     :param endpoint: (Optional) use a different Slack endpoint.
     :return: True if success, False otherwise.
     """
-    response = requests.post(
-        endpoint,
-        json={**{"channel": channel}, **message},
-        headers={"Authorization": f"Bearer {slack_access_token}"},
+    response = __slack_api_post(
+        slack_access_token, endpoint, {**{"channel": channel}, **message}
     )
 
     return response.status_code == 200
 
 
 def slack_post_text_message(
-    slack_access_token: str,
+    slack_access_token: str | SlackSecretProvider,
     channel: str,
     text: str,
     params: dict[str, Any] = None,
@@ -40,7 +69,7 @@ def slack_post_text_message(
     """
     Post an immediate simple text message to slack.
 
-    :param slack_access_token: The bot access token (from your Slack app settings).
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
     :param channel: The channel to post to.
     :param text: The message text.
     :param params: (Optional) additional parameters for Slack
@@ -56,7 +85,7 @@ def slack_post_text_message(
 
 
 def slack_post_blocks_message(
-    slack_access_token: str,
+    slack_access_token: str | SlackSecretProvider,
     channel: str,
     blocks: dict[str, Any],
     params: dict[str, Any] = None,
@@ -65,7 +94,7 @@ def slack_post_blocks_message(
     """
     Post an immediate blocks message to slack.
 
-    :param slack_access_token: The bot access token (from your Slack app settings).
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
     :param channel: The channel to post to.
     :param blocks: The message blocks.
     :param params: (Optional) additional parameters for Slack
@@ -80,6 +109,686 @@ def slack_post_blocks_message(
     )
 
 
+def slack_post_streamed_blocks(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    blocks: Iterable[dict[str, Any]],
+    params: dict[str, Any] = None,
+    max_blocks: int = MAX_BLOCKS_PER_MESSAGE,
+    max_wait: float = 2.0,
+    endpoint: str = "https://slack.com/api/chat.postMessage",
+    max_retries: int = 3,
+) -> bool:
+    """
+    Post a (possibly very large, possibly slowly generated) stream of blocks to slack.
+
+    The blocks are split into messages at Slack's per-message block limit. The first
+    message is posted as soon as it's ready, and the rest follow as threaded replies
+    to it. Posting happens in the background while the block iterable is still being
+    consumed, so the first content shows up before the whole output has been computed.
+    Rate limited (429) messages are retried after the Retry-After delay.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param channel: The channel to post to.
+    :param blocks: An iterable (e.g. a generator) of message blocks.
+    :param params: (Optional) additional parameters for Slack, applied to every message.
+    :param max_blocks: (Optional) maximum blocks per message.
+    :param max_wait: (Optional) seconds after which a partial message is posted anyway (None to disable).
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param max_retries: (Optional) maximum retries of a rate limited message.
+    :return: True if every message was posted successfully, False otherwise.
+    """
+    return __post_chunks_threaded(
+        slack_access_token,
+        channel,
+        slack_chunk_blocks(blocks, max_blocks, max_wait),
+        params,
+        endpoint,
+        max_retries,
+    )
+
+
+def slack_post_streamed_lines(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    lines: Iterable[str],
+    params: dict[str, Any] = None,
+    max_blocks: int = MAX_BLOCKS_PER_MESSAGE,
+    max_wait: float = 2.0,
+    endpoint: str = "https://slack.com/api/chat.postMessage",
+    max_retries: int = 3,
+) -> bool:
+    """
+    Post a (possibly very large, possibly slowly generated) stream of text lines to slack.
+
+    Lines are gathered into mrkdwn section blocks (without splitting lines between sections
+    unless a single line is too long for one) and then posted as with slack_post_streamed_blocks.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param channel: The channel to post to.
+    :param lines: An iterable (e.g. a generator) of lines of text (without trailing newlines).
+    :param params: (Optional) additional parameters for Slack, applied to every message.
+    :param max_blocks: (Optional) maximum blocks per message.
+    :param max_wait: (Optional) seconds after which a partial message is posted anyway (None to disable).
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param max_retries: (Optional) maximum retries of a rate limited message.
+    :return: True if every message was posted successfully, False otherwise.
+    """
+    return slack_post_streamed_blocks(
+        slack_access_token,
+        channel,
+        slack_text_sections(lines, max_wait=max_wait),
+        params,
+        max_blocks,
+        max_wait,
+        endpoint,
+        max_retries,
+    )
+
+
+def slack_progress(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    message: dict[str, Any],
+    min_interval: float = 2.0,
+    endpoint: str = "https://slack.com/api/chat.postMessage",
+    update_endpoint: str = "https://slack.com/api/chat.update",
+) -> "SlackProgress | None":
+    """
+    Post a progress message to slack, and get a handle that can be used to update it.
+
+    Any number of updates can be made through the handle. They are coalesced into
+    `chat.update` edits of the original message, at most one per min_interval, with the
+    newest state always winning. Call `finish` (or use the handle as a context manager)
+    to flush the final state when the job is done.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param channel: The channel to post to.
+    :param message: Message parameters for Slack (should include at least 'text' or 'blocks'!)
+    :param min_interval: (Optional) minimum seconds between edits of the message.
+    :param endpoint: (Optional) use a different Slack endpoint for posting.
+    :param update_endpoint: (Optional) use a different Slack endpoint for updating.
+    :return: The progress handle, or None if the initial message could not be posted.
+    """
+    response = __slack_api_post(
+        slack_access_token, endpoint, {**{"channel": channel}, **message}
+    )
+    body = __json_body(response)
+
+    if response.status_code != 200 or not body.get("ok"):
+        return None
+
+    channel_id, ts = body.get("channel", channel), body["ts"]
+
+    def update(content: dict[str, Any]) -> bool:
+        response = __slack_api_post(
+            slack_access_token,
+            update_endpoint,
+            {**{"channel": channel_id, "ts": ts}, **content},
+        )
+        return response.status_code == 200 and __json_body(response).get("ok", True)
+
+    return SlackProgress(channel_id, ts, update, min_interval)
+
+
+class SlackProgress:
+    """
+    Handle for a progress message posted with slack_progress.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        ts: str,
+        update_func: Callable[[dict[str, Any]], bool],
+        min_interval: float,
+    ):
+        self.channel = channel
+        self.ts = ts
+        self.updates_sent = 0
+        self._update_func = update_func
+        self._min_interval = min_interval
+        self._condition = threading.Condition()
+        self._pending = None
+        self._last_sent = time.monotonic()
+        self._finished = False
+        self._ok = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def update(self, message: dict[str, Any] | str):
+        """
+        Set the latest progress state. This never blocks on the network.
+
+        :param message: Message parameters for Slack, or just some text.
+        """
+        with self._condition:
+            if self._finished:
+                raise RuntimeError("Progress message has already been finished")
+
+            self._pending = {"text": message} if isinstance(message, str) else message
+            self._condition.notify()
+
+    def finish(self, message: dict[str, Any] | str = None) -> bool:
+        """
+        Flush the final progress state (immediately), and stop updating.
+
+        :param message: (Optional) final message parameters for Slack, or just some text.
+        :return: True if every edit was successful, False otherwise.
+        """
+        with self._condition:
+            if message is not None:
+                self._pending = (
+                    {"text": message} if isinstance(message, str) else message
+                )
+
+            self._finished = True
+            self._condition.notify()
+
+        self._thread.join()
+        return self._ok
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self._finished:
+            self.finish()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._finished:
+                    self._condition.wait()
+
+                if self._finished:
+                    break
+
+                wait_for = self._last_sent + self._min_interval - time.monotonic()
+                if wait_for > 0:
+                    # later updates may land while we wait - whatever is newest gets sent
+                    self._condition.wait(wait_for)
+                    continue
+
+                message, self._pending = self._pending, None
+
+            self._send(message)
+
+        with self._condition:
+            message, self._pending = self._pending, None
+
+        if message is not None:
+            self._send(message)
+
+    def _send(self, message: dict[str, Any]):
+        try:
+            self._ok = self._update_func(message) and self._ok
+        except requests.RequestException as e:
+            print(f"Failed to update progress message: {e}")
+            self._ok = False
+
+        self.updates_sent += 1
+        self._last_sent = time.monotonic()
+
+
+def slack_upload_file(
+    slack_access_token: str | SlackSecretProvider,
+    source: str | os.PathLike | BinaryIO | bytes | Iterable[bytes],
+    filename: str,
+    length: int = None,
+    channel_id: str = None,
+    title: str = None,
+    initial_comment: str = None,
+    thread_ts: str = None,
+    chunk_size: int = 256 * 1024,
+    upload_url_endpoint: str = "https://slack.com/api/files.getUploadURLExternal",
+    complete_endpoint: str = "https://slack.com/api/files.completeUploadExternal",
+) -> str | None:
+    """
+    Upload a file to slack (using the external upload flow), streaming its content.
+
+    The content is never loaded into memory all at once - it's sent in chunks of at most
+    chunk_size bytes, so memory use stays flat regardless of file size. Paths are memory
+    mapped. Slack needs the length up front, so for a generator of bytes without a
+    length, the content is first spooled to a temporary file.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param source: A path, a binary file object, bytes, or an iterable (e.g. generator) of bytes.
+    :param filename: The name of the file, as shown in Slack.
+    :param length: (Optional) the length of the content, in bytes, if known.
+    :param channel_id: (Optional) channel to share the file into (otherwise it's private).
+    :param title: (Optional) title of the file.
+    :param initial_comment: (Optional) message text to share the file with.
+    :param thread_ts: (Optional) thread to share the file into.
+    :param chunk_size: (Optional) maximum bytes held in memory at once.
+    :param upload_url_endpoint: (Optional) use a different Slack endpoint for files.getUploadURLExternal.
+    :param complete_endpoint: (Optional) use a different Slack endpoint for files.completeUploadExternal.
+    :return: The Slack file ID if successful, None otherwise.
+    """
+    with contextlib.ExitStack() as stack:
+        body = __UploadBody(__upload_chunks(stack, source, length, chunk_size))
+
+        response = __slack_api_post(
+            slack_access_token,
+            upload_url_endpoint,
+            {"filename": filename, "length": len(body)},
+            form=True,
+        )
+        upload = __json_body(response)
+
+        if response.status_code != 200 or not upload.get("ok"):
+            return None
+
+        response = __session.post(
+            upload["upload_url"],
+            data=body,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        if response.status_code != 200:
+            return None
+
+    complete = {
+        "files": json.dumps([{"id": upload["file_id"], "title": title or filename}])
+    }
+    for key, value in (
+        ("channel_id", channel_id),
+        ("initial_comment", initial_comment),
+        ("thread_ts", thread_ts),
+    ):
+        if value is not None:
+            complete[key] = value
+
+    response = __slack_api_post(
+        slack_access_token, complete_endpoint, complete, form=True
+    )
+
+    if response.status_code != 200 or not __json_body(response).get("ok"):
+        return None
+
+    return upload["file_id"]
+
+
+class SlackApiError(Exception):
+    """
+    Raised when a Slack Web API call made while iterating (where there's no other way to
+    report failure) doesn't succeed.
+    """
+
+    def __init__(self, error: str):
+        super().__init__(error)
+        self.error = error
+
+
+def slack_paginate(
+    slack_access_token: str | SlackSecretProvider,
+    endpoint: str,
+    items_key: str,
+    params: dict[str, Any] = None,
+    limit: int = 200,
+    tier: int = None,
+    prefetch: bool = True,
+    max_retries: int = 3,
+) -> Iterator[Any]:
+    """
+    Lazily iterate over all the items from a cursor-paginated Slack Web API method.
+
+    While you process one page, the next is fetched in the background (unless prefetch is
+    False). If you stop iterating early (break, or close the generator) no further pages
+    are fetched. Rate limiting (429) responses are retried after the Retry-After delay,
+    and if a rate limit tier is given, calls are spaced out to stay within it.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param endpoint: The Slack endpoint (e.g. "https://slack.com/api/users.list").
+    :param items_key: The key of the list of items in each page (e.g. "members").
+    :param params: (Optional) additional parameters for Slack.
+    :param limit: (Optional) page size.
+    :param tier: (Optional) the method's rate limit tier (1-4), to pace calls.
+    :param prefetch: (Optional) fetch the next page while the current one is processed.
+    :param max_retries: (Optional) maximum retries of a rate limited call.
+    :return: A generator of items.
+    :raises SlackApiError: if a call fails.
+    """
+    interval = RATE_LIMIT_TIER_INTERVALS.get(tier, 0)
+    last_call = [0.0]
+
+    def fetch(cursor: str | None) -> dict[str, Any]:
+        payload = {**(params or {}), "limit": limit}
+        if cursor:
+            payload["cursor"] = cursor
+
+        for attempt in range(max_retries + 1):
+            wait = last_call[0] + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            last_call[0] = time.monotonic()
+            response = __slack_api_post(
+                slack_access_token, endpoint, payload, form=True
+            )
+
+            if response.status_code != 429 or attempt == max_retries:
+                break
+
+            time.sleep(__backoff_delay(response, attempt, 1, 30))
+
+        body = __json_body(response)
+
+        if response.status_code != 200 or not body.get("ok"):
+            raise SlackApiError(body.get("error") or f"HTTP {response.status_code}")
+
+        return body
+
+    if not prefetch:
+        cursor = None
+
+        while True:
+            page = fetch(cursor)
+            cursor = page.get("response_metadata", {}).get("next_cursor")
+
+            yield from page.get(items_key, [])
+
+            if not cursor:
+                return
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = pool.submit(fetch, None)
+
+        while future is not None:
+            page = future.result()
+            cursor = page.get("response_metadata", {}).get("next_cursor")
+            future = pool.submit(fetch, cursor) if cursor else None
+
+            yield from page.get(items_key, [])
+    finally:
+        # if iteration stopped early, drop (rather than wait for) any page in flight
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def slack_conversation_history(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    params: dict[str, Any] = None,
+    endpoint: str = "https://slack.com/api/conversations.history",
+    **kwargs,
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily iterate over the messages in a conversation (newest first), prefetching pages.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param channel: The conversation ID.
+    :param params: (Optional) additional parameters for Slack (e.g. oldest, latest).
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param kwargs: (Optional) further options for slack_paginate.
+    :return: A generator of messages.
+    """
+    return slack_paginate(
+        slack_access_token,
+        endpoint,
+        "messages",
+        {**(params or {}), "channel": channel},
+        **{"tier": 3, **kwargs},
+    )
+
+
+def slack_conversation_members(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    endpoint: str = "https://slack.com/api/conversations.members",
+    **kwargs,
+) -> Iterator[str]:
+    """
+    Lazily iterate over the user IDs of the members of a conversation, prefetching pages.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param channel: The conversation ID.
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param kwargs: (Optional) further options for slack_paginate.
+    :return: A generator of user IDs.
+    """
+    return slack_paginate(
+        slack_access_token,
+        endpoint,
+        "members",
+        {"channel": channel},
+        **{"tier": 4, **kwargs},
+    )
+
+
+def slack_users_list(
+    slack_access_token: str | SlackSecretProvider,
+    endpoint: str = "https://slack.com/api/users.list",
+    **kwargs,
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily iterate over the users in a workspace, prefetching pages.
+
+    :param slack_access_token: The bot access token (from your Slack app settings), or a SlackSecretProvider.
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param kwargs: (Optional) further options for slack_paginate.
+    :return: A generator of users.
+    """
+    return slack_paginate(
+        slack_access_token, endpoint, "members", **{"tier": 2, **kwargs}
+    )
+
+
+def slack_chunk_blocks(
+    blocks: Iterable[dict[str, Any]],
+    max_blocks: int = MAX_BLOCKS_PER_MESSAGE,
+    max_wait: float = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Split a stream of blocks into lists that each fit in a single Slack message.
+
+    :param blocks: An iterable of message blocks.
+    :param max_blocks: (Optional) maximum blocks per message.
+    :param max_wait: (Optional) yield a partial list once this many seconds have passed since the last one.
+    :return: A generator of block lists.
+    """
+    chunk = []
+    last_yield = time.monotonic()
+
+    for block in blocks:
+        chunk.append(block)
+
+        if len(chunk) >= max_blocks or __waited(last_yield, max_wait):
+            yield chunk
+            chunk = []
+            last_yield = time.monotonic()
+
+    if chunk:
+        yield chunk
+
+
+def slack_text_sections(
+    lines: Iterable[str],
+    max_chars: int = MAX_SECTION_TEXT_LENGTH,
+    max_wait: float = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Gather a stream of lines into mrkdwn section blocks that fit within Slack's text limit.
+
+    Lines are never split between sections, unless a single line is longer than max_chars.
+
+    :param lines: An iterable of lines of text (without trailing newlines).
+    :param max_chars: (Optional) maximum text length per section.
+    :param max_wait: (Optional) yield a partial section once this many seconds have passed since it was started.
+    :return: A generator of section blocks.
+    """
+    section = []
+    section_length = 0
+    section_started = None
+
+    for line in lines:
+        while len(line) > max_chars:
+            if section:
+                yield __text_section(section)
+                section, section_length = [], 0
+
+            yield __text_section([line[:max_chars]])
+            line = line[max_chars:]
+
+        # +1 for the joining newline
+        if section and section_length + 1 + len(line) > max_chars:
+            yield __text_section(section)
+            section, section_length = [], 0
+
+        if not section:
+            section_started = time.monotonic()
+            section_length = len(line)
+        else:
+            section_length += 1 + len(line)
+
+        section.append(line)
+
+        if __waited(section_started, max_wait):
+            yield __text_section(section)
+            section, section_length = [], 0
+
+    if section:
+        yield __text_section(section)
+
+
+def slack_response_url_post(
+    response_url: str,
+    content: dict[str, Any],
+    connect_timeout: float = 3.05,
+    read_timeout: float = 10,
+    max_attempts: int = 4,
+    backoff_base: float = 0.5,
+    backoff_max: float = 8,
+    budget: float = 30,
+    reserved_uses: int = 1,
+) -> Response | None:
+    """
+    Post a message to a Slack response_url, with timeouts and retries.
+
+    Server errors (5xx), rate limiting (429, honouring Retry-After) and connection errors
+    are retried with jittered exponential backoff, until max_attempts or the time budget
+    runs out.
+
+    Slack only allows each response_url to be used five times, so uses are tracked (per
+    process) and no attempt is made once they're gone. Retries also stop while there
+    are reserved_uses or fewer left, so that a flaky first message can't use up the quota
+    needed by the messages that follow it.
+
+    :param response_url: The Slack response URL from the original message.
+    :param content: The message content (in Slack response format).
+    :param connect_timeout: (Optional) connect timeout for each attempt, in seconds.
+    :param read_timeout: (Optional) read timeout for each attempt, in seconds.
+    :param max_attempts: (Optional) maximum number of attempts.
+    :param backoff_base: (Optional) base delay for exponential backoff, in seconds.
+    :param backoff_max: (Optional) maximum delay between attempts, in seconds.
+    :param budget: (Optional) overall time budget for this post, in seconds.
+    :param reserved_uses: (Optional) number of response_url uses that retries will not touch.
+    :return: The last Response, or None if the response_url has no uses remaining.
+    :raises requests.RequestException: if every attempt failed without a response.
+    """
+    deadline = time.monotonic() + budget
+    response = None
+    error = None
+
+    for attempt in range(max_attempts):
+        remaining = slack_response_url_uses_remaining(response_url)
+
+        if remaining <= 0 or (attempt > 0 and remaining <= reserved_uses):
+            break
+
+        try:
+            response = __session.post(
+                response_url, json=content, timeout=(connect_timeout, read_timeout)
+            )
+            error = None
+            __record_response_url_use(response_url)
+        except requests.ConnectTimeout as e:
+            # never reached Slack, so this didn't cost a use
+            response, error = None, e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            response, error = None, e
+            __record_response_url_use(response_url)
+
+        if response is not None and not __is_retryable(response):
+            return response
+
+        delay = __backoff_delay(response, attempt, backoff_base, backoff_max)
+        if attempt + 1 >= max_attempts or time.monotonic() + delay >= deadline:
+            break
+
+        time.sleep(delay)
+
+    if error is not None:
+        raise error
+
+    return response
+
+
+def slack_response_url_uses_remaining(response_url: str) -> int:
+    """
+    Get the number of uses this process believes a Slack response_url has left.
+
+    :param response_url: The Slack response URL.
+    :return: The number of remaining uses.
+    """
+    with __response_url_lock:
+        uses, first_used = __response_url_uses.get(response_url, (0, time.time()))
+
+        if time.time() - first_used > RESPONSE_URL_LIFETIME:
+            return 0
+
+        return RESPONSE_URL_MAX_USES - uses
+
+
+def slack_prewarm_http(
+    endpoint: str = "https://slack.com/api/api.test", timeout: float = 2.0
+) -> Callable[[], None]:
+    """
+    Build an init hook that opens a pooled connection to Slack, so the first real request
+    doesn't pay for the TCP and TLS handshakes.
+
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :param timeout: (Optional) timeout for the warm-up request, in seconds.
+    :return: The init hook (pass it in init_hooks on any of the decorators).
+    """
+
+    def hook():
+        try:
+            __session.get(endpoint, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"HTTP pre-warm failed: {e}")
+
+    return hook
+
+
+def slack_socket_mode_url(
+    slack_app_token: str | SlackSecretProvider,
+    endpoint: str = "https://slack.com/api/apps.connections.open",
+) -> str | None:
+    """
+    Open a Socket Mode connection (apps.connections.open), getting the WebSocket URL to connect to.
+
+    Each URL can only be connected to once, and only for a short time.
+
+    :param slack_app_token: The app-level token (xapp-..., from your Slack app settings), or a SlackSecretProvider.
+    :param endpoint: (Optional) use a different Slack endpoint.
+    :return: The WebSocket URL if successful, None otherwise.
+    """
+    try:
+        response = __slack_api_post(slack_app_token, endpoint, {})
+    except requests.RequestException as e:
+        print(f"Failed to open Socket Mode connection: {e}")
+        return None
+
+    body = __json_body(response)
+
+    if response.status_code != 200 or not body.get("ok"):
+        print(f"Failed to open Socket Mode connection: {body.get('error')}")
+        return None
+
+    return body["url"]
+
+
 def slack_ephemeral_text_response(
     text: str, params: dict[str, Any] = None
 ) -> dict[str, str]:
@@ -149,6 +858,16 @@ def slack_message_response(
     return {"response_type": response_type, **content, **(params or {})}
 
 
+def slack_view_errors_response(errors: dict[str, str]) -> dict[str, Any]:
+    """
+    Build a response to a view_submission that shows validation errors in the modal.
+
+    :param errors: A dict of block_id -> error message.
+    :return: The response body for conversion to JSON.
+    """
+    return {"response_action": "errors", "errors": errors}
+
+
 def slack_tags(user_ids: list[str], separator: str = " ") -> str:
     """
     Generate a separated list of Slack content markup elements to tag the given user IDs.
@@ -158,3 +877,223 @@ def slack_tags(user_ids: list[str], separator: str = " ") -> str:
     :return: The list of markup tags.
     """
     return separator.join([f"<@{user_id}>" for user_id in (user_ids or [])])
+
+
+def __slack_api_post(
+    slack_access_token: str | SlackSecretProvider,
+    endpoint: str,
+    payload: dict[str, Any],
+    form: bool = False,
+) -> Response:
+    # a few Web API methods (e.g. the file upload ones) only accept form encoding
+    body = {"data": payload} if form else {"json": payload}
+
+    response = __session.post(
+        endpoint,
+        headers=__auth_header(slack_secret_value(slack_access_token)),
+        **body,
+    )
+
+    # only a provider can give us a fresh token, so don't bother checking plain strings
+    if isinstance(slack_access_token, SlackSecretProvider) and __token_rejected(
+        response
+    ):
+        # The token may have been rotated since we cached it - try once more with a fresh one
+        fresh_token = slack_secret_refresh(slack_access_token)
+
+        if fresh_token is not None:
+            response = __session.post(
+                endpoint, headers=__auth_header(fresh_token), **body
+            )
+
+    return response
+
+
+def __token_rejected(response: Response) -> bool:
+    # the Web API mostly reports bad tokens as a 200 with an error, rather than a 401
+    if response.status_code == 401:
+        return True
+
+    return response.status_code == 200 and __json_body(response).get("error") in (
+        "invalid_auth",
+        "token_revoked",
+        "token_expired",
+    )
+
+
+def __auth_header(slack_access_token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {slack_access_token}"}
+
+
+def __post_chunks_threaded(
+    slack_access_token: str | SlackSecretProvider,
+    channel: str,
+    chunks: Iterable[list[dict[str, Any]]],
+    params: dict[str, Any],
+    endpoint: str,
+    max_retries: int,
+) -> bool:
+    state = {"ok": True, "thread_ts": (params or {}).get("thread_ts")}
+
+    def post(chunk: list[dict[str, Any]]):
+        if not state["ok"]:
+            return
+
+        message = {"channel": channel, **(params or {}), "blocks": chunk}
+        if state["thread_ts"] is not None:
+            message["thread_ts"] = state["thread_ts"]
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = __slack_api_post(slack_access_token, endpoint, message)
+            except Exception as e:
+                # anything raised here (e.g. by a secret provider) would otherwise be
+                # lost in the worker's future
+                print(f"Failed to post message chunk: {e}")
+                state["ok"] = False
+                return
+
+            if response.status_code != 429 or attempt == max_retries:
+                break
+
+            time.sleep(__backoff_delay(response, attempt, 1, 30))
+
+        body = __json_body(response)
+
+        if response.status_code != 200 or body.get("ok") is False:
+            state["ok"] = False
+        elif state["thread_ts"] is None:
+            state["thread_ts"] = body.get("ts")
+
+    # A single worker keeps the posts in order, and lets the first one establish the thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for chunk in chunks:
+            if not state["ok"]:
+                break
+
+            pool.submit(post, chunk)
+
+    return state["ok"]
+
+
+def __text_section(lines: list[str]) -> dict[str, Any]:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}}
+
+
+def __waited(since: float, max_wait: float) -> bool:
+    return max_wait is not None and time.monotonic() - since >= max_wait
+
+
+def __json_body(response: Response) -> dict[str, Any]:
+    try:
+        return response.json()
+    except ValueError:
+        return {}
+
+
+def __record_response_url_use(response_url: str):
+    now = time.time()
+
+    with __response_url_lock:
+        # response URLs expire, so there's no point remembering them for longer than that
+        for url, (_, first_used) in list(__response_url_uses.items()):
+            if now - first_used > RESPONSE_URL_LIFETIME:
+                del __response_url_uses[url]
+
+        uses, first_used = __response_url_uses.get(response_url, (0, now))
+        __response_url_uses[response_url] = (uses + 1, first_used)
+
+
+def __is_retryable(response: Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def __backoff_delay(
+    response: Response | None, attempt: int, backoff_base: float, backoff_max: float
+) -> float:
+    if response is not None and response.status_code == 429:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            pass
+
+    return random.uniform(0, min(backoff_max, backoff_base * (2**attempt)))
+
+
+class __UploadBody:
+    # An iterable request body with a known length, so requests streams it with a
+    # Content-Length rather than reading it all into memory
+    def __init__(self, chunks: tuple[int, Iterator[bytes]]):
+        self.length, self.chunks = chunks
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.chunks
+
+
+def __upload_chunks(
+    stack: contextlib.ExitStack,
+    source: str | os.PathLike | BinaryIO | bytes | Iterable[bytes],
+    length: int | None,
+    chunk_size: int,
+) -> tuple[int, Iterator[bytes]]:
+    if isinstance(source, (str, os.PathLike)):
+        f = stack.enter_context(open(source, "rb"))
+        size = os.fstat(f.fileno()).st_size
+
+        if size == 0:
+            return 0, iter(())
+
+        mapped = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        # slices of the mapping are bounded copies, so the mapping can always be closed
+        return size, __slice_chunks(mapped, chunk_size)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        return len(view), __slice_chunks(view, chunk_size)
+
+    if hasattr(source, "read"):
+        if length is None and source.seekable():
+            start = source.tell()
+            length = source.seek(0, os.SEEK_END) - start
+            source.seek(start)
+
+        if length is not None:
+            return length, iter(lambda: source.read(chunk_size), b"")
+
+        source = iter(lambda: source.read(chunk_size), b"")
+
+    if length is not None:
+        return length, __rechunk(source, chunk_size)
+
+    # we need to know the length before we can start, so spool to disk (in bounded chunks)
+    spool = stack.enter_context(tempfile.TemporaryFile())
+    for chunk in __rechunk(source, chunk_size):
+        spool.write(chunk)
+
+    length = spool.tell()
+    spool.seek(0)
+    return length, iter(lambda: spool.read(chunk_size), b"")
+
+
+def __slice_chunks(
+    content: mmap.mmap | memoryview, chunk_size: int
+) -> Iterator[bytes | memoryview]:
+    for offset in range(0, len(content), chunk_size):
+        yield content[offset : offset + chunk_size]
+
+
+def __rechunk(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    buffer = bytearray()
+
+    for chunk in chunks:
+        buffer += chunk
+
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+
+    if buffer:
+        yield bytes(buffer)
@@ -0,0 +1,198 @@
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+
+class SlackProfiler:
+    """
+    Opt-in sampling profiler for handler invocations.
+
+    A fraction (sample_rate) of invocations are run under cProfile (and, optionally,
+    tracemalloc), and a report of the top hot functions and allocation sites is passed to
+    the sink. Unsampled invocations just call straight through.
+
+    Pass an instance as `profiler` to any of the webhook or deferred handler decorators.
+    """
+
+    # tracemalloc is process-wide, so overlapping sampled calls (on other threads, or
+    # other profilers) share it - it's stopped when the last of them finishes
+    _tracing_lock = threading.Lock()
+    _tracing_users = 0
+    _tracing_started = False
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        top_n: int = 20,
+        sink: Callable[[dict[str, Any]], None] = None,
+        trace_allocations: bool = True,
+    ):
+        """
+        :param sample_rate: (Optional) fraction of invocations to profile (0.0 - 1.0).
+        :param top_n: (Optional) number of hot functions / allocation sites to report.
+        :param sink: (Optional) function that receives each report (default: slack_log_sink).
+        :param trace_allocations: (Optional) whether to trace allocations with tracemalloc.
+        """
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.sink = sink or slack_log_sink
+        self.trace_allocations = trace_allocations
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Wrap a function so that its invocations are sampled.
+
+        :param func: The function to wrap.
+        :return: The wrapped function.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.run(func, *args, **kwargs)
+
+        return wrapper
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call a function, profiling it if this invocation is sampled.
+
+        :param func: The function to call.
+        :return: Whatever the function returns.
+        """
+        if random.random() >= self.sample_rate:
+            return func(*args, **kwargs)
+
+        # imported here, so cold starts without profiling don't pay for them
+        import cProfile
+        import tracemalloc
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already active
+            return func(*args, **kwargs)
+
+        if self.trace_allocations:
+            SlackProfiler._start_tracing()
+
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            profile.disable()
+
+            try:
+                snapshot = (
+                    tracemalloc.take_snapshot() if self.trace_allocations else None
+                )
+                self._report(func, duration, profile, snapshot)
+            except Exception as e:
+                # profiling must never fail the invocation
+                print(f"Profiling failed: {e}")
+            finally:
+                if self.trace_allocations:
+                    SlackProfiler._stop_tracing()
+
+    @staticmethod
+    def _start_tracing():
+        import tracemalloc
+
+        with SlackProfiler._tracing_lock:
+            if SlackProfiler._tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                SlackProfiler._tracing_started = True
+
+            SlackProfiler._tracing_users += 1
+
+    @staticmethod
+    def _stop_tracing():
+        import tracemalloc
+
+        with SlackProfiler._tracing_lock:
+            SlackProfiler._tracing_users -= 1
+
+            # leave it running if someone else started it
+            if SlackProfiler._tracing_users == 0 and SlackProfiler._tracing_started:
+                tracemalloc.stop()
+                SlackProfiler._tracing_started = False
+
+    def _report(
+        self,
+        func: Callable,
+        duration: float,
+        profile: "cProfile.Profile",
+        snapshot: "tracemalloc.Snapshot | None",
+    ):
+        import pstats
+
+        stats = pstats.Stats(profile)
+        hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+
+        report = {
+            "function": getattr(func, "__qualname__", repr(func)),
+            "duration_ms": round(duration * 1000, 3),
+            "hot_functions": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3),
+                }
+                for (filename, line, name), (_, calls, total, cumulative, _) in hot[
+                    : self.top_n
+                ]
+            ],
+            "allocations": [
+                {
+                    "site": str(stat.traceback),
+                    "size_kb": round(stat.size / 1024, 3),
+                    "count": stat.count,
+                }
+                for stat in (snapshot.statistics("lineno") if snapshot else [])[
+                    : self.top_n
+                ]
+            ],
+        }
+
+        try:
+            self.sink(report)
+        except Exception as e:
+            print(f"Profile sink failed: {e}")
+
+
+def slack_log_sink(report: dict[str, Any]):
+    """
+    Profile sink that prints each report as a single structured (JSON) log line.
+
+    :param report: The profile report.
+    """
+    print(json.dumps({"slack_profile": report}))
+
+
+def slack_tmp_dump_sink(directory: str = "/tmp") -> Callable[[dict[str, Any]], None]:
+    """
+    Build a profile sink that writes each report to a JSON file.
+
+    :param directory: (Optional) the directory to write reports to.
+    :return: The sink.
+    """
+
+    def sink(report: dict[str, Any]):
+        import uuid
+
+        path = os.path.join(directory, f"slack_profile_{uuid.uuid4().hex}.json")
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+
+    return sink
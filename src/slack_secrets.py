@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from typing import Any, Callable
+
+
+class SlackSecretProvider:
+    """
+    Base class for lazily-resolved Slack secrets (signing secrets, bot tokens and so on).
+
+    Anywhere the library accepts a secret string, an instance of this class can be passed
+    instead. Subclasses must implement `get`, and may override `refresh` if they are able
+    to re-fetch the secret from its source (e.g. after a rotation).
+    """
+
+    def get(self) -> str:
+        """
+        Get the current value of the secret.
+
+        :return: The secret value.
+        """
+        raise NotImplementedError
+
+    def refresh(self) -> str:
+        """
+        Force the secret to be re-read from its source, if that makes sense for this provider.
+
+        :return: The (possibly new) secret value.
+        """
+        return self.get()
+
+
+class CachedSecret(SlackSecretProvider):
+    """
+    A secret that is fetched on first use and cached for a given time-to-live.
+
+    Once the TTL has passed, the cached value continues to be returned while a fresh
+    value is fetched on a background thread, so callers only ever block on the very
+    first fetch (or an explicit `refresh`).
+
+    Explicit refreshes are rate-limited by `min_refresh_interval`, so that (for example)
+    a stream of requests with bad signatures can't be used to hammer your secret store.
+    """
+
+    def __init__(
+        self,
+        fetch_func: Callable[[], str],
+        ttl: float = 300,
+        min_refresh_interval: float = 30,
+    ):
+        """
+        :param fetch_func: A function that fetches the secret value from its source.
+        :param ttl: (Optional) seconds before the cached value is refreshed in the background.
+        :param min_refresh_interval: (Optional) minimum seconds between forced refreshes.
+        """
+        self._fetch_func = fetch_func
+        self._ttl = ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    def get(self) -> str:
+        with self._lock:
+            if self._value is None:
+                return self._fetch_locked()
+
+            if not self._refreshing and time.monotonic() - self._fetched_at > self._ttl:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+
+            return self._value
+
+    def refresh(self) -> str:
+        with self._lock:
+            if (
+                self._value is not None
+                and time.monotonic() - self._fetched_at < self._min_refresh_interval
+            ):
+                return self._value
+
+            return self._fetch_locked()
+
+    def _fetch_locked(self) -> str:
+        self._value = self._fetch_func()
+        self._fetched_at = time.monotonic()
+        return self._value
+
+    def _background_refresh(self):
+        try:
+            value = self._fetch_func()
+
+            with self._lock:
+                self._value = value
+                self._fetched_at = time.monotonic()
+        except Exception as e:
+            print(f"Background secret refresh failed (keeping cached value): {e}")
+        finally:
+            self._refreshing = False
+
+
+class StaticSecret(SlackSecretProvider):
+    """
+    A secret with a fixed value. Mostly useful in tests.
+    """
+
+    def __init__(self, value: str):
+        self._value = value
+
+    def get(self) -> str:
+        return self._value
+
+
+class EnvSecret(SlackSecretProvider):
+    """
+    A secret read from an environment variable each time it is used.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def get(self) -> str:
+        return os.environ[self._name]
+
+
+def slack_secret_from_file(
+    path: str, ttl: float = 300, min_refresh_interval: float = 0
+) -> CachedSecret:
+    """
+    Create a secret that is read (and cached) from a local file. Leading and trailing
+    whitespace is stripped. Handy as a stand-in for a secrets manager in local testing.
+
+    :param path: Path to the file holding the secret.
+    :param ttl: (Optional) seconds before the file is re-read in the background.
+    :param min_refresh_interval: (Optional) minimum seconds between forced refreshes.
+    :return: The secret provider.
+    """
+
+    def fetch():
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+
+    return CachedSecret(fetch, ttl, min_refresh_interval)
+
+
+def slack_secret_from_aws_ssm(
+    client: Any, name: str, ttl: float = 300, min_refresh_interval: float = 30
+) -> CachedSecret:
+    """
+    Create a secret that is fetched (and cached) from an AWS SSM Parameter Store parameter.
+
+    :param client: A boto3 SSM client.
+    :param name: The parameter name.
+    :param ttl: (Optional) seconds before the value is refreshed in the background.
+    :param min_refresh_interval: (Optional) minimum seconds between forced refreshes.
+    :return: The secret provider.
+    """
+    return CachedSecret(
+        lambda: client.get_parameter(Name=name, WithDecryption=True)["Parameter"][
+            "Value"
+        ],
+        ttl,
+        min_refresh_interval,
+    )
+
+
+def slack_secret_from_aws_secrets_manager(
+    client: Any, secret_id: str, ttl: float = 300, min_refresh_interval: float = 30
+) -> CachedSecret:
+    """
+    Create a secret that is fetched (and cached) from AWS Secrets Manager.
+
+    :param client: A boto3 Secrets Manager client.
+    :param secret_id: The secret ID or ARN.
+    :param ttl: (Optional) seconds before the value is refreshed in the background.
+    :param min_refresh_interval: (Optional) minimum seconds between forced refreshes.
+    :return: The secret provider.
+    """
+    return CachedSecret(
+        lambda: client.get_secret_value(SecretId=secret_id)["SecretString"],
+        ttl,
+        min_refresh_interval,
+    )
+
+
+def slack_secret_from_gcp_secret_manager(
+    client: Any, name: str, ttl: float = 300, min_refresh_interval: float = 30
+) -> CachedSecret:
+    """
+    Create a secret that is fetched (and cached) from GCP Secret Manager.
+
+    :param client: A google.cloud.secretmanager SecretManagerServiceClient.
+    :param name: The full secret version name (projects/*/secrets/*/versions/*).
+    :param ttl: (Optional) seconds before the value is refreshed in the background.
+    :param min_refresh_interval: (Optional) minimum seconds between forced refreshes.
+    :return: The secret provider.
+    """
+    return CachedSecret(
+        lambda: client.access_secret_version(
+            request={"name": name}
+        ).payload.data.decode("utf-8"),
+        ttl,
+        min_refresh_interval,
+    )
+
+
+def slack_secret_value(secret: str | SlackSecretProvider) -> str:
+    """
+    Resolve a secret that may be either a plain string or a SlackSecretProvider.
+
+    :param secret: The secret (or provider).
+    :return: The secret value.
+    """
+    if isinstance(secret, SlackSecretProvider):
+        return secret.get()
+
+    return secret
+
+
+def slack_secret_refresh(secret: str | SlackSecretProvider) -> str | None:
+    """
+    Force a refresh of the given secret, if it is a provider.
+
+    :param secret: The secret (or provider).
+    :return: The refreshed value, or None if the secret is a plain string (and so can't change).
+    """
+    if isinstance(secret, SlackSecretProvider):
+        return secret.refresh()
+
+    return None
@@ -0,0 +1,268 @@
+import asyncio
+import inspect
+import json
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Iterable
+from urllib.parse import parse_qs
+
+from slack_admission import EVENT, SLASH_COMMAND, SlackAdmissionController
+from slack_secrets import SlackSecretProvider
+from slack_serverless import (
+    is_valid_slack_request,
+    slack_event_webhook,
+    slack_run_init_hooks,
+    slack_slash_command,
+    verify_slack_request,
+)
+
+
+def slack_slash_command_wsgi(slack_signing_secret: str | SlackSecretProvider, **kwargs):
+    """
+    Decorate a function as a WSGI application that handles Slack slash commands.
+
+    This is for running in a container (e.g. under gunicorn on Cloud Run or Kubernetes) rather
+    than as a serverless function. The decorated function has the same contract as for
+    slack_slash_command_gcp.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for the generic decorator (e.g. init_hooks, admission).
+    :return: The decorated function. This is a WSGI application.
+    """
+
+    def decorator(base_func: Callable[[dict[str, list[str]]], dict[str, Any]]):
+        return __wsgi_app(
+            slack_slash_command(
+                slack_signing_secret,
+                __wsgi_header,
+                __wsgi_body,
+                lambda raw_body: parse_qs(raw_body.decode("utf8")),
+                lambda body, status: (body, status),
+                **kwargs,
+            )(base_func)
+        )
+
+    return decorator
+
+
+def slack_event_webhook_wsgi(slack_signing_secret: str | SlackSecretProvider, **kwargs):
+    """
+    Decorate a function as a WSGI application that handles Slack Event API webhooks.
+
+    This is for running in a container (e.g. under gunicorn on Cloud Run or Kubernetes) rather
+    than as a serverless function. The decorated function has the same contract as for
+    slack_event_webhook_gcp.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for the generic decorator (e.g. init_hooks, admission).
+    :return: The decorated function. This is a WSGI application.
+    """
+
+    def decorator(base_func: Callable[[dict[str, Any]], dict[str, Any]]):
+        return __wsgi_app(
+            slack_event_webhook(
+                slack_signing_secret,
+                __wsgi_header,
+                __wsgi_body,
+                lambda raw_body: json.loads(raw_body),
+                lambda body, status: (body, status),
+                **kwargs,
+            )(base_func)
+        )
+
+    return decorator
+
+
+def slack_slash_command_asgi(
+    slack_signing_secret: str | SlackSecretProvider,
+    init_hooks: Iterable[Callable[[], Any]] = (),
+    admission: SlackAdmissionController = None,
+):
+    """
+    Decorate a function as an ASGI application that handles Slack slash commands.
+
+    This is for running many concurrent requests in one process (e.g. under uvicorn on
+    Cloud Run or Kubernetes). The decorated function has the same contract as for
+    slack_slash_command_gcp, but may also be an `async def` function. Synchronous
+    functions are run on a worker thread so they don't block the event loop.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :param admission: (Optional) a SlackAdmissionController to shed load with when over budget.
+    :return: The decorated function. This is an ASGI application.
+    """
+    slack_run_init_hooks(init_hooks)
+
+    def decorator(base_func: Callable[[dict[str, list[str]]], Any]):
+        async def handle(body: bytes) -> dict[str, Any]:
+            payload = parse_qs(body.decode("utf8"))
+
+            if admission is None:
+                return await __call_handler(base_func, payload)
+
+            return await admission.call_async(
+                SLASH_COMMAND, payload, lambda: __call_handler(base_func, payload)
+            )
+
+        return __asgi_app(slack_signing_secret, handle)
+
+    return decorator
+
+
+def slack_event_webhook_asgi(
+    slack_signing_secret: str | SlackSecretProvider,
+    init_hooks: Iterable[Callable[[], Any]] = (),
+    admission: SlackAdmissionController = None,
+):
+    """
+    Decorate a function as an ASGI application that handles Slack Event API webhooks.
+
+    This is for running many concurrent requests in one process (e.g. under uvicorn on
+    Cloud Run or Kubernetes). The decorated function has the same contract as for
+    slack_event_webhook_gcp, but may also be an `async def` function. Synchronous
+    functions are run on a worker thread so they don't block the event loop.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :param admission: (Optional) a SlackAdmissionController to shed load with when over budget.
+    :return: The decorated function. This is an ASGI application.
+    """
+    slack_run_init_hooks(init_hooks)
+
+    def decorator(base_func: Callable[[dict[str, Any]], Any]):
+        async def handle(body: bytes) -> dict[str, Any]:
+            event = json.loads(body)
+
+            if event.get("type") == "url_verification":
+                return {"challenge": event["challenge"]}
+
+            if admission is None:
+                return await __call_handler(base_func, event)
+
+            return await admission.call_async(
+                EVENT, event, lambda: __call_handler(base_func, event)
+            )
+
+        return __asgi_app(slack_signing_secret, handle)
+
+    return decorator
+
+
+def __wsgi_header(environ: dict[str, Any], name: str) -> str:
+    return environ.get("HTTP_" + name.upper().replace("-", "_"))
+
+
+def __wsgi_body(environ: dict[str, Any]) -> bytes:
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    return environ["wsgi.input"].read(length) if length > 0 else b""
+
+
+def __wsgi_app(handler: Callable[[Any], tuple[dict[str, Any], int]]):
+    def app(environ: dict[str, Any], start_response: Callable):
+        body, status = handler(environ)
+        payload = json.dumps(body).encode()
+
+        start_response(
+            f"{status} {HTTPStatus(status).phrase}",
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(payload))),
+            ],
+        )
+
+        return [payload]
+
+    return app
+
+
+def __asgi_app(
+    slack_signing_secret: str | SlackSecretProvider,
+    handle: Callable[[bytes], Awaitable[dict[str, Any]]],
+):
+    async def app(scope: dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            return await __asgi_lifespan(receive, send)
+
+        if scope["type"] != "http":
+            return
+
+        headers = dict(scope.get("headers") or [])
+        timestamp = __asgi_header(headers, b"x-slack-request-timestamp")
+        signature = __asgi_header(headers, b"x-slack-signature")
+        body = await __asgi_body(receive)
+
+        if not await __verify_async(slack_signing_secret, timestamp, signature, body):
+            return await __asgi_respond(send, {"message": "nope"}, 401)
+
+        await __asgi_respond(send, await handle(body), 200)
+
+    return app
+
+
+async def __verify_async(
+    slack_signing_secret: str | SlackSecretProvider,
+    timestamp: str,
+    signature: str,
+    body: bytes,
+) -> bool:
+    if isinstance(slack_signing_secret, SlackSecretProvider):
+        # providers may need to go to the network (first fetch or rotation), so keep
+        # that off the event loop
+        return await asyncio.to_thread(
+            verify_slack_request, slack_signing_secret, timestamp, signature, body
+        )
+
+    return is_valid_slack_request(slack_signing_secret, timestamp, signature, body)
+
+
+async def __call_handler(base_func: Callable, payload: dict[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(base_func):
+        return await base_func(payload)
+
+    return await asyncio.to_thread(base_func, payload)
+
+
+def __asgi_header(headers: dict[bytes, bytes], name: bytes) -> str | None:
+    value = headers.get(name)
+    return value.decode("latin-1") if value is not None else None
+
+
+async def __asgi_body(receive: Callable) -> bytes:
+    message = await receive()
+    body = message.get("body", b"")
+
+    if not message.get("more_body", False):
+        return body
+
+    parts = [body]
+    while message.get("more_body", False):
+        message = await receive()
+        parts.append(message.get("body", b""))
+
+    return b"".join(parts)
+
+
+async def __asgi_respond(send: Callable, body: Any, status: int):
+    payload = json.dumps(body).encode()
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def __asgi_lifespan(receive: Callable, send: Callable):
+    while True:
+        message = await receive()
+
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
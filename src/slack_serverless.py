@@ -4,11 +4,22 @@ import json
 import time
 import base64
 
-from urllib.parse import parse_qs
-from typing import Any, Callable
+from urllib.parse import parse_qs, unquote_to_bytes
+from functools import lru_cache
+from typing import Any, Callable, Iterable
 
+from slack_admission import EVENT, SLASH_COMMAND, SlackAdmissionController
+from slack_profiling import SlackProfiler
+from slack_secrets import SlackSecretProvider, slack_secret_value, slack_secret_refresh
 
-def slack_slash_command_gcp(slack_signing_secret: str):
+# Event key (AWS) or header (GCP) that marks a keep-warm ping
+WARMUP_KEY = "slack_serverless_warmup"
+WARMUP_HEADER = "X-Slack-Serverless-Warmup"
+
+__stats = {"invocations": 0, "warmups": 0, "cold_starts_saved": 0}
+
+
+def slack_slash_command_gcp(slack_signing_secret: str | SlackSecretProvider, **kwargs):
     """
     Decorate a function as a GCP Cloud Function-compatible Slack slash command webhook handler.
 
@@ -20,7 +31,8 @@ def slack_slash_command_gcp(slack_signing_secret: str):
 
     The return value should be a dict[str, str] with the JSON body for the response back to Slack.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for slack_slash_command (e.g. init_hooks, profiler, admission).
     :return: The decorated function. This can be used directly as a GCP function handler.
     """
     return slack_slash_command(
@@ -29,10 +41,14 @@ def slack_slash_command_gcp(slack_signing_secret: str):
         lambda request: request.get_data(),
         lambda raw_body: parse_qs(raw_body.decode("utf8")),
         lambda body, status: (body, status, __json_header()),
+        **{"warmup_func": __is_gcp_warmup, **kwargs},
     )
 
 
-def slack_slash_command_aws_api_gateway_proxy(slack_signing_secret: str):
+def slack_slash_command_aws_api_gateway_proxy(
+    slack_signing_secret: str | SlackSecretProvider,
+    **kwargs,
+):
     """
     Decorate a function as an AWS API Gateway lambda proxy compatible Slack slash command webhook handler.
 
@@ -44,35 +60,94 @@ def slack_slash_command_aws_api_gateway_proxy(slack_signing_secret: str):
 
     The return value should be a dict[str, str] with the JSON body for the response back to Slack.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
-    :return: The decorated function. This can be used directly as an AWS lambda function handler.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for slack_slash_command (e.g. init_hooks, profiler, admission).
+    :return: The decorated function. This can be used directly as an AWS lambda function handler
+             (behind an API Gateway REST or HTTP API, or a Function URL).
     """
     return slack_slash_command(
         slack_signing_secret,
-        lambda request, name: request["headers"].get(name),
-        __extract_raw_api_gateway_body,
+        slack_aws_header,
+        slack_aws_raw_body,
         lambda raw_body: parse_qs(raw_body.decode()),
         lambda body, status: {
             "statusCode": status,
             "body": json.dumps(body),
             "headers": __json_header(),
         },
+        **{"warmup_func": __is_aws_warmup, **kwargs},
     )
 
 
-def __extract_raw_api_gateway_body(request: Any):
-    if request["headers"].get("isBase64Encoded"):
-        return base64.b64decode(request["body"])
-    else:
-        return str(request["body"]).encode()
+def slack_aws_raw_body(event: dict[str, Any]) -> bytes:
+    """
+    Extract the raw (bytes) request body from an AWS API Gateway REST (payload v1.0),
+    HTTP API (payload v2.0) or Lambda Function URL event.
+
+    The flag that marks a base64-encoded body lives at the top level of the event in
+    all three. A missing (or null) body is returned as empty bytes.
+
+    :param event: The Lambda event.
+    :return: The raw body. This is what Slack signed.
+    """
+    body = event.get("body")
+
+    if body is None:
+        return b""
+
+    if isinstance(body, bytes):
+        return body
+
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body)
+
+    return body.encode()
+
+
+def slack_aws_header(event: dict[str, Any], name: str) -> str | None:
+    """
+    Look up a request header (case-insensitively) in an AWS API Gateway REST (payload v1.0),
+    HTTP API (payload v2.0) or Lambda Function URL event.
+
+    Payload v2.0 and Function URLs lower-case header names, while REST APIs pass them as sent
+    (and may only populate multiValueHeaders).
+
+    :param event: The Lambda event.
+    :param name: The header name.
+    :return: The (first) header value, or None if it isn't present.
+    """
+    headers = event.get("headers") or {}
+
+    value = headers.get(name)
+    if value is not None:
+        return value
+
+    lower = name.lower()
+    value = headers.get(lower)
+    if value is not None:
+        return value
+
+    for key, value in headers.items():
+        if key.lower() == lower:
+            return value
+
+    for key, values in (event.get("multiValueHeaders") or {}).items():
+        if key.lower() == lower and values:
+            return values[0]
+
+    return None
 
 
 def slack_slash_command(
-    slack_signing_secret: str,
+    slack_signing_secret: str | SlackSecretProvider,
     header_func: Callable[[Any, str], str],
     raw_body_func: Callable[[Any], bytes],
     parse_body_func: Callable[[bytes], dict[str, list[str]]],
     response_func: Callable[[dict[str, Any], int], Any],
+    init_hooks: Iterable[Callable[[], Any]] = (),
+    warmup_func: Callable[[Any], bool] = None,
+    profiler: SlackProfiler = None,
+    admission: SlackAdmissionController = None,
 ):
     """
     Decorate a function as a generic serverless Slack slash command webhook handler.
@@ -83,37 +158,55 @@ def slack_slash_command(
     You must provide a number of callables that interface the decorator with your provider-specific
     request/response objects. See the GCP implementation above for an example.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
     :param header_func: A function that obtains a named header from your cloud's request object.
     :param raw_body_func: A function that obtains the raw body from your cloud's request object.
     :param parse_body_func: A function that parses the raw body of your cloud's request object as form-encoded data
     :param response_func: A function that encodes a JSON body and HTTP status code as a response for your cloud.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :param warmup_func: (Optional) a function that recognises warm-up pings, which are answered without verification.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :param admission: (Optional) a SlackAdmissionController to shed load with when over budget.
     :return: The decorated function. This can be used directly as a function handler for your cloud platform.
     """
+    slack_run_init_hooks(init_hooks)
 
     def decorator(base_func: Callable[[dict[str, list[str]]], dict[str, Any]]):
         def handler(
             request: Any, *args, **kwargs
         ) -> tuple[dict[str, Any], int, dict[str, str]]:
+            if __is_warmup(request, warmup_func):
+                return response_func(__warmup(), 200)
+
             timestamp, sig, request_data = __extract_validation_data(
                 request, header_func, raw_body_func
             )
 
-            if not is_valid_slack_request(
+            if not verify_slack_request(
                 slack_signing_secret, timestamp, sig, request_data
             ):
                 return response_func(__unauthorized(), 401)
 
+            payload = parse_body_func(request_data)
+
+            if admission is None:
+                return response_func(base_func(payload, *args, **kwargs), 200)
+
             return response_func(
-                base_func(parse_body_func(request_data), *args, **kwargs), 200
+                admission.call(
+                    SLASH_COMMAND,
+                    payload,
+                    lambda: base_func(payload, *args, **kwargs),
+                ),
+                200,
             )
 
-        return handler
+        return handler if profiler is None else profiler.wrap(handler)
 
     return decorator
 
 
-def slack_event_webhook_gcp(slack_signing_secret: str):
+def slack_event_webhook_gcp(slack_signing_secret: str | SlackSecretProvider, **kwargs):
     """
     Decorate a function as a GCP Cloud Function-compatible Slack Event API webhook handler.
 
@@ -125,19 +218,24 @@ def slack_event_webhook_gcp(slack_signing_secret: str):
 
     The return value should be a dict[str, str] with the JSON body for the response back to Slack.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for slack_event_webhook (e.g. init_hooks, profiler, admission).
     :return: The decorated function. This can be used directly as a GCP function handler.
     """
     return slack_event_webhook(
         slack_signing_secret,
         lambda request, name: request.headers.get(name),
         lambda request: request.get_data(),
-        lambda raw_body: json.loads(raw_body.decode("utf8")),
+        json.loads,
         lambda body, status: (body, status, __json_header()),
+        **{"warmup_func": __is_gcp_warmup, **kwargs},
     )
 
 
-def slack_event_webhook_aws_api_gateway_proxy(slack_signing_secret: str):
+def slack_event_webhook_aws_api_gateway_proxy(
+    slack_signing_secret: str | SlackSecretProvider,
+    **kwargs,
+):
     """
     Decorate a function as an AWS API Gateway lambda proxy compatible Slack Event API webhook handler.
 
@@ -149,28 +247,35 @@ def slack_event_webhook_aws_api_gateway_proxy(slack_signing_secret: str):
 
     The return value should be a dict[str, str] with the JSON body for the response back to Slack.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
-    :return: The decorated function. This can be used directly as a Lambda function handler.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param kwargs: (Optional) further options for slack_event_webhook (e.g. init_hooks, profiler, admission).
+    :return: The decorated function. This can be used directly as a Lambda function handler
+             (behind an API Gateway REST or HTTP API, or a Function URL).
     """
     return slack_event_webhook(
         slack_signing_secret,
-        lambda request, name: request["headers"].get(name),
-        lambda request: request["body"],
-        lambda raw_body: json.loads(raw_body),
+        slack_aws_header,
+        slack_aws_raw_body,
+        json.loads,
         lambda body, status: {
             "statusCode": status,
             "body": json.dumps(body),
             "headers": __json_header(),
         },
+        **{"warmup_func": __is_aws_warmup, **kwargs},
     )
 
 
 def slack_event_webhook(
-    slack_signing_secret: str,
+    slack_signing_secret: str | SlackSecretProvider,
     header_func: Callable[[Any, str], str],
     raw_body_func: Callable[[Any], bytes],
     parse_body_func: Callable[[bytes], dict[str, Any]],
     response_func: Callable[[dict[str, Any], int], Any],
+    init_hooks: Iterable[Callable[[], Any]] = (),
+    warmup_func: Callable[[Any], bool] = None,
+    profiler: SlackProfiler = None,
+    admission: SlackAdmissionController = None,
 ):
     """
     Decorate a function as a generic serverless Slack Event API webhook handler.
@@ -181,23 +286,31 @@ def slack_event_webhook(
     You must provide a number of callables that interface the decorator with your provider-specific
     request/response objects. See the GCP implementation above for an example.
 
-    :param slack_signing_secret: The Slack signing secret for your app.
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
     :param header_func: A function that obtains a named header from your cloud's request object.
     :param raw_body_func: A function that obtains the raw body from your cloud's request object.
     :param parse_body_func: A function that parses the raw body of your cloud's request object as JSON
     :param response_func: A function that encodes a JSON body and HTTP status code as a response for your cloud.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :param warmup_func: (Optional) a function that recognises warm-up pings, which are answered without verification.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :param admission: (Optional) a SlackAdmissionController to shed load with when over budget.
     :return: The decorated function. This can be used directly as a function handler for your cloud platform.
     """
+    slack_run_init_hooks(init_hooks)
 
     def decorator(base_func: Callable[[dict[str, Any]], dict[str, Any]]):
         def handler(
             request: Any, *args, **kwargs
         ) -> tuple[dict[str, Any], int, dict[str, str]]:
+            if __is_warmup(request, warmup_func):
+                return response_func(__warmup(), 200)
+
             timestamp, sig, request_data = __extract_validation_data(
                 request, header_func, raw_body_func
             )
 
-            if not is_valid_slack_request(
+            if not verify_slack_request(
                 slack_signing_secret, timestamp, sig, request_data
             ):
                 return response_func(__unauthorized(), 401)
@@ -207,13 +320,183 @@ def slack_event_webhook(
             if body.get("type") == "url_verification":
                 return response_func({"challenge": body["challenge"]}, 200)
 
-            return response_func(base_func(body, *args, **kwargs), 200)
+            if admission is None:
+                return response_func(base_func(body, *args, **kwargs), 200)
 
-        return handler
+            return response_func(
+                admission.call(EVENT, body, lambda: base_func(body, *args, **kwargs)),
+                200,
+            )
+
+        return handler if profiler is None else profiler.wrap(handler)
 
     return decorator
 
 
+def slack_interaction_webhook_gcp(
+    slack_signing_secret: str | SlackSecretProvider,
+    validate_view: Callable[[dict[str, Any]], dict[str, str] | None] = None,
+    **kwargs,
+):
+    """
+    Decorate a function as a GCP Cloud Function-compatible Slack interactive component webhook handler
+    (block actions, view submissions, shortcuts and so on).
+
+    This decorator will automatically handle Slack signature verification for you and will
+    pass the decoded interaction payload (JSON) into your decorated function.
+
+    The return value should be a dict[str, Any] with the JSON body for the response back to Slack,
+    or None to just acknowledge the interaction.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param validate_view: (Optional) view_submission validator - see slack_interaction_webhook.
+    :param kwargs: (Optional) further options for slack_interaction_webhook (e.g. init_hooks, profiler).
+    :return: The decorated function. This can be used directly as a GCP function handler.
+    """
+    return slack_interaction_webhook(
+        slack_signing_secret,
+        lambda request, name: request.headers.get(name),
+        lambda request: request.get_data(),
+        lambda body, status: ("", status)
+        if body is None
+        else (body, status, __json_header()),
+        validate_view,
+        **{"warmup_func": __is_gcp_warmup, **kwargs},
+    )
+
+
+def slack_interaction_webhook_aws_api_gateway_proxy(
+    slack_signing_secret: str | SlackSecretProvider,
+    validate_view: Callable[[dict[str, Any]], dict[str, str] | None] = None,
+    **kwargs,
+):
+    """
+    Decorate a function as an AWS API Gateway lambda proxy compatible Slack interactive component
+    webhook handler (block actions, view submissions, shortcuts and so on).
+
+    This decorator will automatically handle Slack signature verification for you and will
+    pass the decoded interaction payload (JSON) into your decorated function.
+
+    The return value should be a dict[str, Any] with the JSON body for the response back to Slack,
+    or None to just acknowledge the interaction.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param validate_view: (Optional) view_submission validator - see slack_interaction_webhook.
+    :param kwargs: (Optional) further options for slack_interaction_webhook (e.g. init_hooks, profiler).
+    :return: The decorated function. This can be used directly as a Lambda function handler
+             (behind an API Gateway REST or HTTP API, or a Function URL).
+    """
+    return slack_interaction_webhook(
+        slack_signing_secret,
+        slack_aws_header,
+        slack_aws_raw_body,
+        lambda body, status: {"statusCode": status, "body": ""}
+        if body is None
+        else {
+            "statusCode": status,
+            "body": json.dumps(body),
+            "headers": __json_header(),
+        },
+        validate_view,
+        **{"warmup_func": __is_aws_warmup, **kwargs},
+    )
+
+
+def slack_interaction_webhook(
+    slack_signing_secret: str | SlackSecretProvider,
+    header_func: Callable[[Any, str], str],
+    raw_body_func: Callable[[Any], bytes],
+    response_func: Callable[[dict[str, Any] | None, int], Any],
+    validate_view: Callable[[dict[str, Any]], dict[str, str] | None] = None,
+    init_hooks: Iterable[Callable[[], Any]] = (),
+    warmup_func: Callable[[Any], bool] = None,
+    profiler: SlackProfiler = None,
+):
+    """
+    Decorate a function as a generic serverless Slack interactive component webhook handler.
+
+    This decorator will automatically handle Slack signature verification for you and will
+    pass the decoded interaction payload (JSON) into your decorated function. The payload is
+    decoded straight from the raw form-encoded body (see parse_slack_interaction_payload).
+
+    If validate_view is given, it is called first for view_submission interactions. If it
+    returns any errors, they are sent straight back to Slack (to be shown against the relevant
+    inputs in the modal) and the decorated function is not called.
+
+    You must provide a number of callables that interface the decorator with your provider-specific
+    request/response objects. See the GCP implementation above for an example.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :param header_func: A function that obtains a named header from your cloud's request object.
+    :param raw_body_func: A function that obtains the raw body from your cloud's request object.
+    :param response_func: A function that encodes a JSON body (or None, for an empty body) and HTTP status code as a response for your cloud.
+    :param validate_view: (Optional) a function that returns a dict of block_id -> error message for a view_submission payload.
+    :param init_hooks: (Optional) functions to run once, at decoration (module load) time - see slack_prewarm_secret.
+    :param warmup_func: (Optional) a function that recognises warm-up pings, which are answered without verification.
+    :param profiler: (Optional) a SlackProfiler to sample invocations with.
+    :return: The decorated function. This can be used directly as a function handler for your cloud platform.
+    """
+    slack_run_init_hooks(init_hooks)
+
+    def decorator(base_func: Callable[[dict[str, Any]], dict[str, Any] | None]):
+        def handler(request: Any, *args, **kwargs) -> Any:
+            if __is_warmup(request, warmup_func):
+                return response_func(__warmup(), 200)
+
+            timestamp, sig, request_data = __extract_validation_data(
+                request, header_func, raw_body_func
+            )
+
+            if not verify_slack_request(
+                slack_signing_secret, timestamp, sig, request_data
+            ):
+                return response_func(__unauthorized(), 401)
+
+            payload = parse_slack_interaction_payload(request_data)
+
+            if validate_view is not None and payload.get("type") == "view_submission":
+                errors = validate_view(payload)
+
+                if errors:
+                    return response_func(
+                        {"response_action": "errors", "errors": errors}, 200
+                    )
+
+            return response_func(base_func(payload, *args, **kwargs), 200)
+
+        return handler if profiler is None else profiler.wrap(handler)
+
+    return decorator
+
+
+def parse_slack_interaction_payload(raw_body: bytes) -> dict[str, Any]:
+    """
+    Decode the JSON payload from the raw (form-encoded) body of a Slack interaction request.
+
+    Slack sends interactions as a single form field, `payload`, holding JSON. This goes straight
+    from the raw body to the decoded JSON, without building an intermediate form dict.
+
+    :param raw_body: The raw (bytes) body.
+    :return: The decoded payload.
+    :raises ValueError: if the body has no payload field, or it isn't valid JSON.
+    """
+    if isinstance(raw_body, str):
+        raw_body = raw_body.encode()
+
+    if raw_body.startswith(b"payload="):
+        start = 8
+    else:
+        start = raw_body.find(b"&payload=")
+        if start < 0:
+            raise ValueError("No payload field in interaction body")
+        start += 9
+
+    end = raw_body.find(b"&", start)
+    field = raw_body[start:] if end < 0 else raw_body[start:end]
+
+    return json.loads(unquote_to_bytes(field.replace(b"+", b" ")))
+
+
 def __extract_validation_data(
     request: Any,
     header_func: Callable[[Any, str], str],
@@ -226,6 +509,48 @@ def __extract_validation_data(
     return timestamp, sig, request_data
 
 
+def verify_slack_request(
+    slack_signing_secret: str | SlackSecretProvider,
+    timestamp: str,
+    signature: str,
+    raw_body: bytes,
+) -> bool:
+    """
+    Verify a Slack request against a signing secret that may be a SlackSecretProvider.
+
+    If verification fails with the cached secret, it is refreshed (in case it has been
+    rotated) and the check retried once.
+
+    :param slack_signing_secret: The Slack signing secret (or a SlackSecretProvider).
+    :param timestamp: The value from the X-Slack-Request-Timestamp header.
+    :param signature: The value from the X-Slack-Signature header.
+    :param raw_body: The raw (bytes) payload.
+    :return: True if validation is successful, False otherwise.
+    """
+    if is_valid_slack_request(
+        slack_secret_value(slack_signing_secret), timestamp, signature, raw_body
+    ):
+        return True
+
+    # Don't bother hitting the secret store for requests that could never validate
+    if timestamp is None or signature is None or not __is_fresh(timestamp):
+        return False
+
+    # The secret may have been rotated since we cached it - try once more with a fresh value
+    fresh_secret = slack_secret_refresh(slack_signing_secret)
+
+    return fresh_secret is not None and is_valid_slack_request(
+        fresh_secret, timestamp, signature, raw_body
+    )
+
+
+def __is_fresh(timestamp: str) -> bool:
+    try:
+        return abs(time.time() - int(timestamp)) <= 300
+    except ValueError:
+        return False
+
+
 def is_valid_slack_request(
     slack_signing_secret: str,
     timestamp: str,
@@ -248,18 +573,13 @@ def is_valid_slack_request(
     if abs(time.time() - int(timestamp)) > 300:
         return False
 
-    if isinstance(raw_body, bytes):
-        raw_body = str(raw_body.decode())
-
-    basestring = "v0:" + str(timestamp) + ":" + raw_body
-    expected_signature = (
-        "v0="
-        + hmac.new(
-            slack_signing_secret.encode(),
-            msg=basestring.encode(),
-            digestmod=hashlib.sha256,
-        ).hexdigest()
-    )
+    if isinstance(raw_body, str):
+        raw_body = raw_body.encode()
+
+    mac = __hmac_for_secret(slack_signing_secret).copy()
+    mac.update(b"v0:" + str(timestamp).encode() + b":")
+    mac.update(raw_body)
+    expected_signature = "v0=" + mac.hexdigest()
 
     if not hmac.compare_digest(expected_signature, signature):
         return False
@@ -267,6 +587,89 @@ def is_valid_slack_request(
     return True
 
 
+def slack_prewarm_secret(
+    slack_signing_secret: str | SlackSecretProvider,
+) -> Callable[[], None]:
+    """
+    Build an init hook that fetches the signing secret and prepares the HMAC key for it,
+    so the first request doesn't have to.
+
+    :param slack_signing_secret: The Slack signing secret for your app (or a SlackSecretProvider).
+    :return: The init hook (pass it in init_hooks on any of the decorators).
+    """
+
+    def hook():
+        __hmac_for_secret(slack_secret_value(slack_signing_secret))
+        json.loads(json.dumps({"type": "url_verification"}))
+
+    return hook
+
+
+def slack_run_init_hooks(init_hooks: Iterable[Callable[[], Any]]):
+    """
+    Run init hooks (e.g. from slack_prewarm_secret), as the decorators do with init_hooks.
+
+    A hook that fails is logged and skipped - the first real request will just have to
+    do that work itself.
+
+    :param init_hooks: The hooks to run.
+    """
+    for hook in init_hooks:
+        try:
+            hook()
+        except Exception as e:
+            # the first real request will just have to pay for it
+            print(f"Init hook failed: {e}")
+
+
+def slack_warmup_stats() -> dict[str, int]:
+    """
+    Get warm-up statistics for this process (container).
+
+    `warmups` counts the warm-up pings answered. `cold_starts_saved` counts the pings that
+    arrived at a cold container, i.e. cold starts that were paid for by a ping rather than
+    by a real Slack request.
+
+    :return: A dict of counters.
+    """
+    return dict(__stats)
+
+
+def __is_warmup(request: Any, warmup_func: Callable[[Any], bool]) -> bool:
+    cold = __stats["invocations"] == 0
+    __stats["invocations"] += 1
+
+    if warmup_func is None or not warmup_func(request):
+        return False
+
+    __stats["warmups"] += 1
+    if cold:
+        __stats["cold_starts_saved"] += 1
+
+    return True
+
+
+def __is_aws_warmup(request: Any) -> bool:
+    # either our own ping, or an EventBridge scheduled event
+    return isinstance(request, dict) and bool(
+        request.get(WARMUP_KEY) or request.get("source") == "aws.events"
+    )
+
+
+def __is_gcp_warmup(request: Any) -> bool:
+    return request.headers.get(WARMUP_HEADER) is not None
+
+
+@lru_cache(maxsize=8)
+def __hmac_for_secret(slack_signing_secret: str) -> hmac.HMAC:
+    # keyed, but not yet fed any data - copied for each request
+    return hmac.new(slack_signing_secret.encode(), digestmod=hashlib.sha256)
+
+
+def __warmup() -> dict[str, bool]:
+    return {"warmup": True}
+
+
 def __unauthorized() -> dict[str, str]:
     return {"message": "nope"}
 
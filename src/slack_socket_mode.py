@@ -0,0 +1,246 @@
+import json
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+from websockets.sync.client import connect
+
+from slack_messaging import slack_response_url_post, slack_socket_mode_url
+from slack_profiling import SlackProfiler
+from slack_secrets import SlackSecretProvider
+
+SLASH_COMMANDS = "slash_commands"
+EVENTS_API = "events_api"
+
+
+class SlackSocketModeRunner:
+    """
+    Runs Slack handlers over Socket Mode, for always-on (container) deployments where
+    there's no need for a public webhook.
+
+    Handlers are the same functions you'd decorate with slack_slash_command or
+    slack_event_webhook - slash command handlers receive the payload as dict[str, list[str]],
+    event handlers receive the Events API body. Slash command responses are posted to the
+    command's response_url.
+
+    Each of the pooled WebSocket connections acknowledges envelopes as soon as they arrive,
+    then hands them to a bounded worker pool. When that pool (and max_pending) is full, the
+    connections stop reading until it drains. Dropped connections, and disconnects
+    requested by Slack, are re-opened automatically (with jittered backoff on failure).
+    """
+
+    def __init__(
+        self,
+        slack_app_token: str | SlackSecretProvider,
+        slash_command_func: Callable[[dict[str, list[str]]], dict[str, Any]] = None,
+        event_func: Callable[[dict[str, Any]], Any] = None,
+        connections: int = 2,
+        max_workers: int = 8,
+        max_pending: int = 64,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        profiler: SlackProfiler = None,
+        endpoint: str = "https://slack.com/api/apps.connections.open",
+    ):
+        """
+        :param slack_app_token: The app-level token (xapp-..., from your Slack app settings), or a SlackSecretProvider.
+        :param slash_command_func: (Optional) the slash command handler.
+        :param event_func: (Optional) the Events API handler.
+        :param connections: (Optional) number of WebSocket connections to keep open (Slack allows up to 10).
+        :param max_workers: (Optional) number of worker threads running handlers.
+        :param max_pending: (Optional) number of envelopes that may wait for a worker.
+        :param reconnect_delay: (Optional) initial delay before retrying a failed connection, in seconds.
+        :param max_reconnect_delay: (Optional) maximum delay between connection retries, in seconds.
+        :param profiler: (Optional) a SlackProfiler to sample handler invocations with.
+        :param endpoint: (Optional) use a different Slack endpoint for apps.connections.open.
+        """
+        self.slack_app_token = slack_app_token
+        self.connections = connections
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.endpoint = endpoint
+
+        self._handlers = {}
+        if slash_command_func is not None:
+            self._handlers[SLASH_COMMANDS] = self._slash_command(slash_command_func)
+        if event_func is not None:
+            self._handlers[EVENTS_API] = event_func
+        if profiler is not None:
+            self._handlers = {
+                kind: profiler.wrap(handler) for kind, handler in self._handlers.items()
+            }
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._sockets: dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "received": 0,
+            "acked": 0,
+            "handled": 0,
+            "failed": 0,
+            "ignored": 0,
+        }
+
+    def start(self) -> "SlackSocketModeRunner":
+        """
+        Open the connections (in background threads) and start handling envelopes.
+
+        :return: This runner.
+        """
+        self._stopping.clear()
+
+        for index in range(self.connections):
+            thread = threading.Thread(
+                target=self._run_connection,
+                args=(index,),
+                name=f"slack-socket-mode-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        return self
+
+    def run_forever(self):
+        """
+        Start the runner, and block until it's stopped (or interrupted).
+        """
+        self.start()
+
+        try:
+            self._stopping.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10):
+        """
+        Close the connections, and wait for in-flight handlers to finish.
+
+        :param timeout: (Optional) seconds to wait for each connection thread to exit.
+        """
+        self._stopping.set()
+
+        with self._lock:
+            open_sockets = list(self._sockets.values())
+
+        for websocket in open_sockets:
+            websocket.close()
+
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+        self._threads = []
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get counters for this runner.
+
+        :return: A dict of counters.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _run_connection(self, index: int):
+        delay = self.reconnect_delay
+
+        while not self._stopping.is_set():
+            requested_reconnect = False
+            url = slack_socket_mode_url(self.slack_app_token, self.endpoint)
+
+            if url is not None:
+                try:
+                    with connect(url) as websocket:
+                        self._count("connects")
+                        with self._lock:
+                            self._sockets[index] = websocket
+
+                        delay = self.reconnect_delay
+                        requested_reconnect = self._receive(websocket)
+                except (OSError, ConnectionClosed, InvalidHandshake) as e:
+                    print(f"Socket Mode connection {index} failed: {e}")
+                finally:
+                    with self._lock:
+                        self._sockets.pop(index, None)
+
+            if self._stopping.is_set():
+                break
+
+            self._count("reconnects")
+
+            if not requested_reconnect:
+                # jittered, so the pool doesn't reconnect in lock-step
+                self._stopping.wait(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _receive(self, websocket: Any) -> bool:
+        # returns True if Slack asked us to reconnect
+        for message in websocket:
+            try:
+                envelope = json.loads(message)
+            except ValueError:
+                print(f"Received apparently-malformed envelope: {message}")
+                continue
+
+            kind = envelope.get("type")
+
+            if kind == "disconnect":
+                return True
+
+            if "envelope_id" not in envelope:
+                # hello, and anything else that doesn't need an ack
+                continue
+
+            websocket.send(json.dumps({"envelope_id": envelope["envelope_id"]}))
+            self._count("received", "acked")
+
+            handler = self._handlers.get(kind)
+            if handler is None:
+                self._count("ignored")
+                continue
+
+            # blocks (so we stop reading) while the pool is saturated
+            self._slots.acquire()
+            self._executor.submit(self._dispatch, handler, envelope.get("payload", {}))
+
+        return False
+
+    def _dispatch(self, handler: Callable[[dict[str, Any]], Any], payload: Any):
+        try:
+            handler(payload)
+            self._count("handled")
+        except Exception as e:
+            print(f"Socket Mode handler failed: {e}")
+            self._count("failed")
+        finally:
+            self._slots.release()
+
+    def _count(self, *counters: str):
+        with self._lock:
+            for counter in counters:
+                self._stats[counter] += 1
+
+    @staticmethod
+    def _slash_command(
+        slash_command_func: Callable[[dict[str, list[str]]], dict[str, Any]]
+    ) -> Callable[[dict[str, Any]], None]:
+        def handler(payload: dict[str, Any]):
+            # same shape as the webhook decorators pass (i.e. parse_qs)
+            response = slash_command_func(
+                {key: [value] for key, value in payload.items()}
+            )
+
+            if response is not None and payload.get("response_url"):
+                slack_response_url_post(payload["response_url"], response)
+
+        return handler
@@ -1,6 +1,25 @@
+import hashlib
+import hmac
 import os
 import sys
+import time
 
 TEST_PATH = os.path.dirname(__file__)
 SOURCE_PATH = os.path.join(TEST_PATH, "..", "src")
 sys.path.append(SOURCE_PATH)
+
+SECRET = "test-secret"
+
+
+def sign(body: bytes, secret: str = SECRET) -> tuple[str, str]:
+    """
+    Sign a request body the way Slack does.
+
+    :return: The request timestamp and signature headers.
+    """
+    timestamp = str(int(time.time()))
+    basestring = b"v0:" + timestamp.encode() + b":" + body
+    return (
+        timestamp,
+        "v0=" + hmac.new(secret.encode(), basestring, hashlib.sha256).hexdigest(),
+    )
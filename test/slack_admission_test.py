@@ -0,0 +1,188 @@
+import json
+import threading
+from urllib.parse import parse_qs, urlencode
+
+import sure
+from slack_admission import (
+    LOW,
+    PriorityClass,
+    SlackAdmissionController,
+    TokenBucket,
+)
+from slack_deferral import InMemoryDeferralBackend
+from slack_serverless import slack_event_webhook, slack_slash_command
+
+from . import SECRET, sign
+
+
+def signed(body: bytes) -> dict:
+    timestamp, signature = sign(body)
+
+    return {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": signature,
+        "body": body,
+    }
+
+
+def event_webhook(admission):
+    return slack_event_webhook(
+        SECRET,
+        lambda request, name: request.get(name),
+        lambda request: request["body"],
+        json.loads,
+        lambda body, status: (body, status),
+        admission=admission,
+    )
+
+
+def event_request(event_type: str, n: int = 0) -> dict:
+    return signed(
+        json.dumps(
+            {
+                "type": "event_callback",
+                "event_id": f"Ev{n}",
+                "event": {"type": event_type, "channel": "C1", "user": "U1"},
+            }
+        ).encode()
+    )
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=0.001, burst=2)
+
+    bucket.take().should.be.true
+    bucket.take().should.be.true
+    bucket.take().should.be.false
+
+
+def test_low_priority_events_over_rate_are_shed():
+    admission = SlackAdmissionController(
+        classes={LOW: PriorityClass(rate=0.001, burst=2)}
+    )
+    handled = []
+
+    @event_webhook(admission)
+    def handler(body):
+        handled.append(body["event"]["type"])
+        return {"handled": True}
+
+    responses = [handler(event_request("message", n)) for n in range(5)]
+    handler(event_request("app_mention")).should.equal(({"handled": True}, 200))
+
+    [status for _, status in responses].should.equal([200] * 5)
+    [body for body, _ in responses].should.equal([{"handled": True}] * 2 + [{}] * 3)
+    handled.should.equal(["message", "message", "app_mention"])
+
+    stats = admission.stats()
+    stats[LOW].should.equal({"admitted": 2, "shed": 3, "deferred": 0, "in_flight": 0})
+    stats["normal"]["admitted"].should.equal(1)
+
+
+def test_url_verification_is_never_shed():
+    admission = SlackAdmissionController(
+        classes={"normal": PriorityClass(rate=0.001, burst=0)}
+    )
+
+    @event_webhook(admission)
+    def handler(body):
+        raise AssertionError("should not be called")
+
+    body = json.dumps({"type": "url_verification", "challenge": "abc"}).encode()
+    handler(signed(body)).should.equal(({"challenge": "abc"}, 200))
+
+
+def test_in_flight_limit():
+    admission = SlackAdmissionController(classes={LOW: PriorityClass(max_in_flight=1)})
+    entered = threading.Event()
+    proceed = threading.Event()
+
+    @event_webhook(admission)
+    def handler(body):
+        entered.set()
+        proceed.wait(5)
+        return {"handled": True}
+
+    first = {}
+    thread = threading.Thread(
+        target=lambda: first.update(response=handler(event_request("message", 1)))
+    )
+    thread.start()
+    entered.wait(5)
+
+    handler(event_request("message", 2)).should.equal(({}, 200))
+    admission.stats()[LOW]["in_flight"].should.equal(1)
+
+    proceed.set()
+    thread.join(5)
+
+    first["response"].should.equal(({"handled": True}, 200))
+    admission.stats()[LOW]["in_flight"].should.equal(0)
+
+
+def test_shed_events_are_deferred():
+    backend = InMemoryDeferralBackend()
+    admission = SlackAdmissionController(
+        classes={LOW: PriorityClass(max_in_flight=0)},
+        defer_backend=backend,
+    )
+
+    @event_webhook(admission)
+    def handler(body):
+        raise AssertionError("should not be called")
+
+    handler(event_request("message", 7)).should.equal(({}, 200))
+
+    len(backend).should.equal(1)
+    admission.stats()[LOW]["deferred"].should.equal(1)
+
+    (_, envelope), *_ = backend._peek(1)
+    envelope["response_target"].should.equal("C1")
+    envelope["interaction_type"].should.equal("event")
+    envelope["event"]["event_id"].should.equal("Ev7")
+
+
+def test_slash_commands_classified_by_command():
+    backend = InMemoryDeferralBackend()
+    admission = SlackAdmissionController(
+        classes={LOW: PriorityClass(max_in_flight=0)},
+        priorities={"/report": LOW},
+        defer_backend=backend,
+        shed_response={"text": "Busy - we'll get back to you"},
+    )
+
+    handler = slack_slash_command(
+        SECRET,
+        lambda request, name: request.get(name),
+        lambda request: request["body"],
+        lambda raw_body: parse_qs(raw_body.decode()),
+        lambda body, status: (body, status),
+        admission=admission,
+    )(lambda payload: {"text": "done"})
+
+    def command(name: str) -> dict:
+        return signed(
+            urlencode(
+                {"command": name, "user_id": "U1", "response_url": "https://r/1"}
+            ).encode()
+        )
+
+    handler(command("/hello")).should.equal(({"text": "done"}, 200))
+    handler(command("/report")).should.equal(
+        ({"text": "Busy - we'll get back to you"}, 200)
+    )
+
+    len(backend).should.equal(1)
+    admission.stats()["high"]["admitted"].should.equal(1)
+    admission.stats()[LOW]["deferred"].should.equal(1)
+
+
+def test_default_controller_limits_message_events():
+    admission = SlackAdmissionController()
+
+    admission.classify("event", {"event": {"type": "message"}}).should.equal(LOW)
+    admission.classify("event", {"event": {"type": "app_mention"}}).should.equal(
+        "normal"
+    )
+    admission.classify("slash_command", {"command": ["/hi"]}).should.equal("high")
+    set(admission.stats()).should.equal({"high", "normal", LOW})
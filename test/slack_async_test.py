@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import httpretty
+import sure
+from slack_async import (
+    slack_async_call,
+    slack_async_request,
+    slack_event_loop,
+    slack_run,
+)
+from slack_deferral import (
+    LOCAL_BATCH_KEY,
+    InMemoryDeferralBackend,
+    slack_defer,
+    slack_deferred_handler,
+    slack_envelope,
+)
+
+
+def test_event_loop_persists():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    slack_run(current_loop()).should.be(slack_event_loop())
+    slack_run(current_loop()).should.be(slack_event_loop())
+
+
+def test_slack_async_call_overlaps_blocking_calls():
+    async def main():
+        return await asyncio.gather(
+            *(slack_async_call(time.sleep, 0.1) for _ in range(5))
+        )
+
+    started = time.monotonic()
+    slack_run(main())
+
+    (time.monotonic() - started).should.be.lower_than(0.4)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_async_request_happy():
+    httpretty.register_uri(httpretty.GET, "https://test.slack.endpoint/", body="hi")
+
+    response = slack_run(slack_async_request("GET", "https://test.slack.endpoint/"))
+
+    response.text.should.equal("hi")
+
+
+def test_async_deferred_handler_runs_batch_concurrently():
+    backend = InMemoryDeferralBackend()
+    handled = []
+
+    @slack_deferred_handler(backend)
+    async def handler(response_target, user_id, interaction_type, event, data):
+        await asyncio.sleep(0.1)
+        handled.append(response_target)
+
+    for n in range(5):
+        slack_defer(backend, f"https://response/{n}", "U123", "slash", {})
+
+    started = time.monotonic()
+    backend.drain(handler, batch_size=5)
+
+    (time.monotonic() - started).should.be.lower_than(0.4)
+    sorted(handled).should.equal([f"https://response/{n}" for n in range(5)])
+
+
+def test_concurrent_invocations_share_the_loop():
+    handled = []
+    errors = []
+
+    @slack_deferred_handler(InMemoryDeferralBackend())
+    async def handler(response_target, user_id, interaction_type, event, data):
+        await asyncio.sleep(0.1)
+        handled.append(response_target)
+
+    def invoke(n: int):
+        try:
+            handler(
+                {
+                    LOCAL_BATCH_KEY: [
+                        {
+                            "id": n,
+                            "envelope": slack_envelope(
+                                f"https://response/{n}", "U123", "slash", {}
+                            ),
+                        }
+                    ]
+                }
+            )
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=invoke, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    errors.should.equal([])
+    sorted(handled).should.equal([f"https://response/{n}" for n in range(4)])
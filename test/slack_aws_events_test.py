@@ -0,0 +1,137 @@
+import base64
+import json
+
+import sure
+from slack_serverless import (
+    slack_aws_header,
+    slack_aws_raw_body,
+    slack_event_webhook_aws_api_gateway_proxy,
+    slack_slash_command_aws_api_gateway_proxy,
+)
+
+from . import SECRET, sign
+
+
+def rest_event(body: bytes, base64_encoded: bool = False) -> dict:
+    timestamp, signature = sign(body)
+
+    return {
+        "resource": "/slack",
+        "headers": {
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": signature,
+        },
+        "multiValueHeaders": {
+            "X-Slack-Request-Timestamp": [timestamp],
+            "X-Slack-Signature": [signature],
+        },
+        "isBase64Encoded": base64_encoded,
+        "body": base64.b64encode(body).decode() if base64_encoded else body.decode(),
+    }
+
+
+def http_api_event(body: bytes, base64_encoded: bool = True) -> dict:
+    # payload v2.0 - Function URL events have the same shape
+    timestamp, signature = sign(body)
+
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "headers": {
+            "x-slack-request-timestamp": timestamp,
+            "x-slack-signature": signature,
+        },
+        "isBase64Encoded": base64_encoded,
+        "body": base64.b64encode(body).decode() if base64_encoded else body.decode(),
+    }
+
+
+def test_raw_body_plain():
+    slack_aws_raw_body({"body": "a=1&b=é"}).should.equal("a=1&b=é".encode())
+
+
+def test_raw_body_base64_flag_at_top_level():
+    slack_aws_raw_body(
+        {"isBase64Encoded": True, "body": base64.b64encode(b"\x00\xffraw").decode()}
+    ).should.equal(b"\x00\xffraw")
+
+
+def test_raw_body_ignores_flag_in_headers():
+    slack_aws_raw_body(
+        {"headers": {"isBase64Encoded": "true"}, "body": "YQ=="}
+    ).should.equal(b"YQ==")
+
+
+def test_raw_body_missing():
+    slack_aws_raw_body({"body": None}).should.equal(b"")
+    slack_aws_raw_body({}).should.equal(b"")
+
+
+def test_header_lookup_is_case_insensitive():
+    event = {"headers": {"x-slack-signature": "sig"}}
+
+    slack_aws_header(event, "X-Slack-Signature").should.equal("sig")
+    slack_aws_header(event, "X-Slack-Request-Timestamp").should.be.none
+
+
+def test_header_lookup_falls_back_to_multi_value_headers():
+    event = {"headers": None, "multiValueHeaders": {"X-Slack-Signature": ["a", "b"]}}
+
+    slack_aws_header(event, "x-slack-signature").should.equal("a")
+
+
+def test_slash_command_rest_api():
+    @slack_slash_command_aws_api_gateway_proxy(SECRET)
+    def handler(payload):
+        return {"text": payload["text"][0]}
+
+    response = handler(rest_event(b"command=%2Fhi&text=hello+there"))
+
+    response["statusCode"].should.equal(200)
+    json.loads(response["body"]).should.equal({"text": "hello there"})
+
+
+def test_slash_command_http_api_base64():
+    @slack_slash_command_aws_api_gateway_proxy(SECRET)
+    def handler(payload):
+        return {"text": payload["text"][0]}
+
+    response = handler(http_api_event(b"command=%2Fhi&text=caf%C3%A9"))
+
+    response["statusCode"].should.equal(200)
+    json.loads(response["body"]).should.equal({"text": "café"})
+
+
+def test_event_webhook_http_api():
+    @slack_event_webhook_aws_api_gateway_proxy(SECRET)
+    def handler(payload):
+        return {"got": payload["event"]["type"]}
+
+    body = json.dumps({"type": "event_callback", "event": {"type": "app_mention"}})
+    response = handler(http_api_event(body.encode(), base64_encoded=False))
+
+    response["statusCode"].should.equal(200)
+    json.loads(response["body"]).should.equal({"got": "app_mention"})
+
+
+def test_event_webhook_rest_api_base64_challenge():
+    @slack_event_webhook_aws_api_gateway_proxy(SECRET)
+    def handler(payload):
+        raise AssertionError("should not be called")
+
+    body = json.dumps({"type": "url_verification", "challenge": "abc"}).encode()
+    response = handler(rest_event(body, base64_encoded=True))
+
+    response["statusCode"].should.equal(200)
+    json.loads(response["body"]).should.equal({"challenge": "abc"})
+
+
+def test_tampered_body_rejected():
+    @slack_event_webhook_aws_api_gateway_proxy(SECRET)
+    def handler(payload):
+        raise AssertionError("should not be called")
+
+    event = http_api_event(b"{}", base64_encoded=False)
+    event["body"] = '{"a": 1}'
+
+    handler(event)["statusCode"].should.equal(401)
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+
+import sure
+from slack_admission import PriorityClass, SlackAdmissionController
+from slack_defer_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    ResilientDefer,
+    ResilientDeferralBackend,
+    SqliteSpool,
+)
+from slack_deferral import DeferralBackend, SnsDeferralBackend, slack_defer
+
+
+class FakeDefer:
+    def __init__(self, results=None, block: threading.Event = None, delay: float = 0):
+        self.results = list(results or [])
+        self.block = block
+        self.delay = delay
+        self.published = []
+
+    def __call__(self, publisher, topic, response_target, *rest):
+        if self.block is not None:
+            self.block.wait()
+
+        time.sleep(self.delay)
+
+        ok = self.results.pop(0) if self.results else True
+        if ok:
+            self.published.append(response_target)
+        return ok
+
+
+class FakeBackend(SnsDeferralBackend):
+    def __init__(self, results=None):
+        super().__init__()
+        self.results = list(results or [])
+        self.published = []
+
+    def publish(self, envelope):
+        ok = self.results.pop(0) if self.results else True
+        if ok:
+            self.published.append(envelope)
+        return ok
+
+
+def defer_args(n):
+    return ("publisher", "topic", f"https://response/{n}", "U123", "slash", {})
+
+
+def wait_for_replay(resilient, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while len(resilient.spool) > 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+
+    breaker.record_failure()
+    breaker.state.should.equal(CLOSED)
+    breaker.record_failure()
+    breaker.state.should.equal(HALF_OPEN)
+
+    breaker.allow().should.be.true
+    breaker.allow().should.be.false
+    breaker.record_success()
+    breaker.state.should.equal(CLOSED)
+
+
+def test_circuit_breaker_stays_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    breaker.record_failure()
+
+    breaker.state.should.equal(OPEN)
+    breaker.allow().should.be.false
+
+
+def test_sqlite_spool_fifo(tmp_path):
+    spool = SqliteSpool(str(tmp_path / "spool.sqlite3"))
+    spool.push({"n": 1})
+    spool.push({"n": 2})
+
+    [envelope for _, envelope in spool.peek(10)].should.equal([{"n": 1}, {"n": 2}])
+
+    spool.remove(spool.peek(1)[0][0])
+    len(spool).should.equal(1)
+
+    # and it's durable
+    len(SqliteSpool(str(tmp_path / "spool.sqlite3"))).should.equal(1)
+
+
+def test_resilient_defer_spools_when_open_and_replays():
+    defer = FakeDefer(results=[False, False])
+    resilient = ResilientDefer(
+        defer,
+        CircuitBreaker(failure_threshold=2, reset_timeout=0),
+        SqliteSpool(":memory:"),
+    )
+
+    resilient(*defer_args(1)).should.be.true
+    resilient(*defer_args(2)).should.be.true
+    len(resilient.spool).should.equal(2)
+
+    resilient(*defer_args(3)).should.be.true
+    wait_for_replay(resilient)
+
+    defer.published.should.equal(
+        ["https://response/3", "https://response/1", "https://response/2"]
+    )
+    len(resilient.spool).should.equal(0)
+
+
+def test_resilient_defer_latency_budget():
+    block = threading.Event()
+    defer = FakeDefer(block=block)
+    resilient = ResilientDefer(
+        defer,
+        CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        SqliteSpool(":memory:"),
+        latency_budget=0.05,
+    )
+
+    resilient(*defer_args(1)).should.be.true
+    resilient.breaker.state.should.equal(OPEN)
+    len(resilient.spool).should.equal(1)
+
+    # fails fast now, without calling through
+    resilient(*defer_args(2)).should.be.true
+    len(resilient.spool).should.equal(2)
+
+    block.set()
+
+
+def test_resilient_defer_replays_off_the_request_path():
+    defer = FakeDefer(delay=0.1)
+    spool = SqliteSpool(":memory:")
+    for n in range(10):
+        spool.push(
+            {
+                "topic": "topic",
+                "response_target": f"https://spooled/{n}",
+                "user_id": "U123",
+                "interaction_type": "slash",
+                "event": {},
+                "data": {},
+            }
+        )
+
+    resilient = ResilientDefer(defer, spool=spool)
+
+    started = time.monotonic()
+    resilient(*defer_args(1)).should.be.true
+    (time.monotonic() - started).should.be.lower_than(0.5)
+
+    wait_for_replay(resilient)
+    len(defer.published).should.equal(11)
+
+
+def test_resilient_backend_spools_and_replays_through_slack_defer():
+    inner = FakeBackend(results=[False])
+    backend = ResilientDeferralBackend(
+        inner,
+        CircuitBreaker(failure_threshold=1, reset_timeout=0),
+        SqliteSpool(":memory:"),
+    )
+
+    slack_defer(backend, "https://response/1", "U123", "slash", {}).should.be.true
+    len(backend.spool).should.equal(1)
+
+    slack_defer(backend, "https://response/2", "U123", "slash", {}).should.be.true
+    wait_for_replay(backend)
+
+    [envelope["response_target"] for envelope in inner.published].should.equal(
+        ["https://response/2", "https://response/1"]
+    )
+    inner.published[1].should.equal(
+        {
+            "response_target": "https://response/1",
+            "user_id": "U123",
+            "interaction_type": "slash",
+            "event": {},
+            "data": {},
+        }
+    )
+
+
+def test_resilient_backend_decodes_with_the_wrapped_backend():
+    backend = ResilientDeferralBackend(FakeBackend(), spool=SqliteSpool(":memory:"))
+    record = {"messageId": "m1", "body": json.dumps({"Message": json.dumps({"n": 1})})}
+
+    isinstance(backend, DeferralBackend).should.be.true
+    backend.decode({"Records": [record]}).should.equal([({"n": 1}, "m1")])
+
+
+def test_admission_sheds_into_resilient_backend():
+    backend = ResilientDeferralBackend(
+        FakeBackend(results=[False]),
+        CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        SqliteSpool(":memory:"),
+    )
+    admission = SlackAdmissionController(
+        classes={"low": PriorityClass(max_in_flight=0)}, defer_backend=backend
+    )
+
+    admission.call(
+        "event", {"event": {"type": "message", "channel": "C1"}}, lambda: None
+    ).should.equal({})
+
+    len(backend.spool).should.equal(1)
+    admission.stats()["low"]["deferred"].should.equal(1)
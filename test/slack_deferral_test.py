@@ -0,0 +1,119 @@
+import base64
+import json
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+
+import pytest
+import sure
+from slack_deferral import (
+    InMemoryDeferralBackend,
+    PubSubDeferralBackend,
+    SnsDeferralBackend,
+    SqliteDeferralBackend,
+    slack_defer,
+    slack_deferred_handler,
+    slack_envelope,
+)
+
+
+def test_slack_envelope_happy():
+    slack_envelope("https://response", "U123", "slash", {"text": "hi"}).should.equal(
+        {
+            "response_target": "https://response",
+            "user_id": "U123",
+            "interaction_type": "slash",
+            "event": {"text": "hi"},
+            "data": {},
+        }
+    )
+
+
+def test_in_memory_backend_pipeline():
+    backend = InMemoryDeferralBackend()
+    handled = []
+
+    @slack_deferred_handler(backend)
+    def handler(response_target, user_id, interaction_type, event, data):
+        handled.append((response_target, data))
+
+    for n in range(25):
+        slack_defer(backend, f"https://response/{n}", "U123", "slash", {}, {"n": n})
+
+    backend.drain(handler, batch_size=10).should.equal(25)
+
+    len(handled).should.equal(25)
+    handled[0].should.equal(("https://response/0", {"n": 0}))
+    len(backend).should.equal(0)
+
+
+def test_sqlite_backend_pipeline(tmp_path):
+    backend = SqliteDeferralBackend(str(tmp_path / "deferral.sqlite3"))
+    handled = []
+
+    @slack_deferred_handler(backend)
+    def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(event["event_id"])
+
+    slack_defer(backend, "C123", "U123", "event", {"event_id": "Ev1"}).should.be.true
+    slack_defer(backend, "C123", "U123", "event", {"event_id": "Ev2"}).should.be.true
+
+    backend.drain(handler, batch_size=1, max_batches=1).should.equal(1)
+    handled.should.equal(["Ev1"])
+    len(backend).should.equal(1)
+
+
+def test_sns_backend_decodes_every_record():
+    envelopes = [
+        slack_envelope(f"https://response/{n}", "U1", "slash", {}) for n in range(2)
+    ]
+    event = {
+        "Records": [
+            {
+                "messageId": f"m{n}",
+                "body": json.dumps({"Message": json.dumps(envelope)}),
+            }
+            for n, envelope in enumerate(envelopes)
+        ]
+    }
+
+    SnsDeferralBackend().decode(event).should.equal(
+        [(envelopes[0], "m0"), (envelopes[1], "m1")]
+    )
+
+
+def test_pubsub_backend_decodes_background_and_push_events():
+    envelope = slack_envelope("https://response", "U1", "slash", {})
+    data = base64.b64encode(json.dumps(envelope).encode()).decode()
+
+    PubSubDeferralBackend().decode({"data": data}).should.equal([(envelope, None)])
+    PubSubDeferralBackend().decode(
+        {"message": {"data": data, "messageId": "123"}}
+    ).should.equal([(envelope, "123")])
+
+
+def test_pubsub_backend_publish_timeout_is_a_failure():
+    pytest.importorskip("google.cloud.pubsub_v1")
+
+    future = Future()
+    future.set_exception(FutureTimeoutError())
+    backend = PubSubDeferralBackend(
+        SimpleNamespace(publish=lambda topic, data, timeout: future), "topic"
+    )
+
+    backend.publish(
+        slack_envelope("https://response", "U1", "slash", {})
+    ).should.be.false
+
+
+def test_deferred_handler_skips_malformed():
+    handled = []
+
+    @slack_deferred_handler(SnsDeferralBackend())
+    def handler(*args):
+        handled.append(args)
+
+    handler({"nope": True})
+    handler({"Records": [{"body": json.dumps({"Message": "{}"})}]})
+
+    handled.should.have.length_of(0)
@@ -0,0 +1,357 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+import sure
+from slack_deferral import (
+    InMemoryDeferralBackend,
+    SnsDeferralBackend,
+    slack_defer,
+    slack_deferred_handler,
+)
+from slack_idempotency import (
+    DynamoDbProcessedMessageStore,
+    FirestoreProcessedMessageStore,
+    InMemoryProcessedMessageStore,
+    SlackMessageInProgressError,
+    SqliteProcessedMessageStore,
+    slack_idempotency_key,
+)
+
+
+class FakeDynamoTable:
+    """
+    Local stand-in for a boto3 DynamoDB Table resource, supporting the conditional puts
+    the store uses.
+    """
+
+    class ConditionalCheckFailedException(Exception):
+        pass
+
+    def __init__(self, key_attribute: str = "message_key"):
+        self.key_attribute = key_attribute
+        self.items = {}
+        self.meta = SimpleNamespace(
+            client=SimpleNamespace(
+                exceptions=SimpleNamespace(
+                    ConditionalCheckFailedException=self.ConditionalCheckFailedException
+                )
+            )
+        )
+
+    def put_item(
+        self, Item, ConditionExpression=None, ExpressionAttributeValues=None, **_
+    ):
+        key = Item[self.key_attribute]
+        existing = self.items.get(key)
+
+        if ConditionExpression is not None and existing is not None:
+            # attribute_not_exists(#key) OR expires_at <= :now
+            if existing["expires_at"] > ExpressionAttributeValues[":now"]:
+                raise self.ConditionalCheckFailedException()
+
+        self.items[key] = dict(Item)
+
+    def get_item(self, Key, **_):
+        item = self.items.get(Key[self.key_attribute])
+        return {} if item is None else {"Item": dict(item)}
+
+    def delete_item(self, Key):
+        self.items.pop(Key[self.key_attribute], None)
+
+
+class FakeFirestoreClient:
+    """
+    Local stand-in for a google.cloud.firestore Client.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.version = 0
+
+    def collection(self, name):
+        client = self
+
+        class Document:
+            def __init__(self, document_id):
+                self.path = (name, document_id)
+
+            def get(self):
+                data, version = client.documents.get(self.path, (None, None))
+                return SimpleNamespace(
+                    exists=data is not None,
+                    update_time=version,
+                    to_dict=lambda: dict(data),
+                )
+
+            def create(self, data):
+                from google.api_core.exceptions import AlreadyExists
+
+                if self.path in client.documents:
+                    raise AlreadyExists("exists")
+                self.set(data)
+
+            def update(self, data, option=None):
+                from google.api_core.exceptions import FailedPrecondition
+
+                if client.documents[self.path][1] != option:
+                    raise FailedPrecondition("changed")
+                self.set(data)
+
+            def set(self, data):
+                client.version += 1
+                client.documents[self.path] = (dict(data), client.version)
+
+            def delete(self):
+                client.documents.pop(self.path, None)
+
+        return SimpleNamespace(document=Document)
+
+    def write_option(self, last_update_time):
+        return last_update_time
+
+
+def check_store(store):
+    store.claim("a", 60).should.be.true
+    store.claim("a", 60).should.be.false
+    store.is_complete("a").should.be.false
+
+    store.complete("a")
+    store.claim("a", 60).should.be.false
+    store.is_complete("a").should.be.true
+
+    store.claim("b", 60).should.be.true
+    store.release("b")
+    store.claim("b", 60).should.be.true
+
+
+def check_expired_lease_can_be_taken_over(store):
+    store.claim("c", -1).should.be.true
+    store.claim("c", 60).should.be.true
+    store.claim("c", 60).should.be.false
+
+
+def test_in_memory_store():
+    check_store(InMemoryProcessedMessageStore())
+    check_expired_lease_can_be_taken_over(InMemoryProcessedMessageStore())
+
+
+def test_in_memory_store_evicts_least_recently_seen():
+    store = InMemoryProcessedMessageStore(max_entries=2)
+
+    for key in ("a", "b", "c"):
+        store.claim(key, 60)
+        store.complete(key)
+
+    store.claim("a", 60).should.be.true
+    store.claim("c", 60).should.be.false
+
+
+def test_sqlite_store(tmp_path):
+    check_store(SqliteProcessedMessageStore(str(tmp_path / "processed.sqlite3")))
+    check_expired_lease_can_be_taken_over(SqliteProcessedMessageStore(":memory:"))
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "processed.sqlite3")
+
+    SqliteProcessedMessageStore(path).claim("a", 60).should.be.true
+    SqliteProcessedMessageStore(path).claim("a", 60).should.be.false
+
+
+def test_dynamodb_store():
+    check_store(DynamoDbProcessedMessageStore(FakeDynamoTable()))
+    check_expired_lease_can_be_taken_over(
+        DynamoDbProcessedMessageStore(FakeDynamoTable())
+    )
+
+
+def test_firestore_store():
+    pytest.importorskip("google.api_core.exceptions")
+
+    check_store(FirestoreProcessedMessageStore(FakeFirestoreClient()))
+    check_expired_lease_can_be_taken_over(
+        FirestoreProcessedMessageStore(FakeFirestoreClient())
+    )
+
+
+def test_idempotency_key():
+    slack_idempotency_key(
+        {
+            "interaction_type": "slash_command",
+            "response_target": "https://r",
+            "event": {},
+        },
+        "m1",
+    ).should.equal("https://r")
+    slack_idempotency_key(
+        {
+            "interaction_type": "event",
+            "response_target": "C1",
+            "event": {"event_id": "Ev1"},
+        },
+        "m1",
+    ).should.equal("Ev1")
+    slack_idempotency_key(
+        {"interaction_type": "event", "response_target": "C1", "event": {}}, "m1"
+    ).should.equal("m1")
+
+
+def test_deferred_handler_skips_redelivered_messages():
+    backend = InMemoryDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    handled = []
+
+    @slack_deferred_handler(backend, store=store)
+    def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(event["event_id"])
+
+    for event_id in ("Ev1", "Ev2", "Ev1"):
+        slack_defer(backend, "C123", "U123", "event", {"event_id": event_id})
+
+    backend.drain(handler).should.equal(3)
+    handled.should.equal(["Ev1", "Ev2"])
+
+
+def test_deferred_handler_releases_claim_on_failure():
+    backend = SnsDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    attempts = []
+
+    @slack_deferred_handler(backend, store=store)
+    def handler(response_target, user_id, interaction_type, event, data):
+        attempts.append(response_target)
+        if len(attempts) == 1:
+            raise RuntimeError("downstream unavailable")
+
+    record = {
+        "messageId": "m1",
+        "body": json.dumps(
+            {
+                "Message": json.dumps(
+                    {
+                        "response_target": "https://response/1",
+                        "user_id": "U123",
+                        "interaction_type": "slash_command",
+                        "event": {},
+                    }
+                )
+            }
+        ),
+    }
+
+    handler.when.called_with({"Records": [record]}).should.throw(RuntimeError)
+    handler({"Records": [record]})
+    handler({"Records": [record]})
+
+    attempts.should.equal(["https://response/1", "https://response/1"])
+
+
+def test_async_deferred_handler_skips_redelivered_messages():
+    backend = InMemoryDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    handled = []
+
+    @slack_deferred_handler(backend, store=store)
+    async def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(response_target)
+
+    for n in (1, 2, 1, 2):
+        slack_defer(backend, f"https://response/{n}", "U123", "slash_command", {})
+
+    backend.drain(handler, batch_size=2).should.equal(4)
+    sorted(handled).should.equal(["https://response/1", "https://response/2"])
+
+
+def slash_batch(backend, count: int):
+    for n in range(count):
+        slack_defer(backend, f"https://hooks/{n}", "U123", "slash_command", {})
+
+
+def test_failure_mid_batch_leaves_the_rest_unclaimed():
+    backend = InMemoryDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    attempts = []
+
+    @slack_deferred_handler(backend, store=store)
+    def handler(response_target, user_id, interaction_type, event, data):
+        attempts.append(response_target)
+        if len(attempts) == 1:
+            raise RuntimeError("downstream unavailable")
+
+    slash_batch(backend, 3)
+
+    backend.drain.when.called_with(handler).should.throw(RuntimeError)
+    backend.drain(handler).should.equal(3)
+
+    attempts.should.equal(
+        ["https://hooks/0", "https://hooks/0", "https://hooks/1", "https://hooks/2"]
+    )
+
+
+def test_messages_in_progress_elsewhere_are_not_acknowledged():
+    backend = InMemoryDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    handled = []
+
+    @slack_deferred_handler(backend, store=store)
+    def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(response_target)
+
+    slash_batch(backend, 3)
+
+    # another worker holds the lease on the second message
+    store.claim("https://hooks/1", 60)
+
+    backend.drain.when.called_with(handler).should.throw(SlackMessageInProgressError)
+    handled.should.equal(["https://hooks/0", "https://hooks/2"])
+    len(backend).should.equal(3)
+
+    # ...and then fails, so the redelivery processes it
+    store.release("https://hooks/1")
+    backend.drain(handler).should.equal(3)
+
+    handled.should.equal(["https://hooks/0", "https://hooks/2", "https://hooks/1"])
+
+
+def test_async_messages_in_progress_elsewhere_are_not_acknowledged():
+    backend = InMemoryDeferralBackend()
+    store = InMemoryProcessedMessageStore()
+    handled = []
+
+    @slack_deferred_handler(backend, store=store)
+    async def handler(response_target, user_id, interaction_type, event, data):
+        handled.append(response_target)
+
+    slash_batch(backend, 2)
+    store.claim("https://hooks/0", 60)
+
+    backend.drain.when.called_with(handler).should.throw(SlackMessageInProgressError)
+    handled.should.equal(["https://hooks/1"])
+
+
+def test_async_claims_are_settled_off_the_event_loop():
+    settled_on = []
+
+    class RecordingStore(InMemoryProcessedMessageStore):
+        def complete(self, key):
+            settled_on.append(threading.current_thread().name)
+            super().complete(key)
+
+        def release(self, key):
+            settled_on.append(threading.current_thread().name)
+            super().release(key)
+
+    backend = InMemoryDeferralBackend()
+
+    @slack_deferred_handler(backend, store=RecordingStore())
+    async def handler(response_target, user_id, interaction_type, event, data):
+        if response_target.endswith("/1"):
+            raise RuntimeError("downstream unavailable")
+
+    slash_batch(backend, 2)
+
+    backend.drain.when.called_with(handler).should.throw(RuntimeError)
+    settled_on.should.have.length_of(2)
+    settled_on.shouldnt.contain("slack-event-loop")
@@ -0,0 +1,75 @@
+import json
+from urllib.parse import urlencode
+
+import sure
+from slack_serverless import (
+    parse_slack_interaction_payload,
+    slack_interaction_webhook,
+)
+
+from . import SECRET, sign
+
+
+def signed_handler(body: bytes, base_func, validate_view=None):
+    timestamp, signature = sign(body)
+    headers = {"X-Slack-Request-Timestamp": timestamp, "X-Slack-Signature": signature}
+
+    return slack_interaction_webhook(
+        SECRET,
+        lambda request, name: headers.get(name),
+        lambda request: body,
+        lambda response, status: (response, status),
+        validate_view,
+    )(base_func)
+
+
+def encode(payload: dict) -> bytes:
+    return urlencode({"payload": json.dumps(payload)}).encode()
+
+
+def test_parse_slack_interaction_payload_happy():
+    payload = {"type": "block_actions", "text": "a & b + c = 100%"}
+
+    parse_slack_interaction_payload(encode(payload)).should.equal(payload)
+
+
+def test_parse_slack_interaction_payload_not_first_field():
+    parse_slack_interaction_payload(b"other=1&payload=%7B%22a%22%3A+1%7D").should.equal(
+        {"a": 1}
+    )
+
+
+def test_parse_slack_interaction_payload_missing():
+    parse_slack_interaction_payload.when.called_with(b"other=1").should.throw(
+        ValueError
+    )
+
+
+def test_slack_interaction_webhook_happy():
+    body = encode({"type": "block_actions", "actions": [{"action_id": "go"}]})
+
+    handler = signed_handler(body, lambda payload: payload["actions"][0])
+
+    handler({}).should.equal(({"action_id": "go"}, 200))
+
+
+def test_slack_interaction_webhook_ack():
+    handler = signed_handler(encode({"type": "shortcut"}), lambda payload: None)
+
+    handler({}).should.equal((None, 200))
+
+
+def test_slack_interaction_webhook_view_validation_errors():
+    calls = []
+    body = encode({"type": "view_submission", "view": {"state": {"values": {}}}})
+
+    handler = signed_handler(
+        body,
+        lambda payload: calls.append(payload),
+        validate_view=lambda payload: {"email_block": "Required"},
+    )
+
+    handler({}).should.equal(
+        ({"response_action": "errors", "errors": {"email_block": "Required"}}, 200)
+    )
+    calls.should.have.length_of(0)
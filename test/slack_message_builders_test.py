@@ -6,6 +6,7 @@ from slack_messaging import (
     slack_in_channel_blocks_response,
     slack_message_response,
     slack_tags,
+    slack_view_errors_response,
 )
 
 
@@ -143,3 +144,12 @@ def test_slack_tags_two_happy():
 
 def test_slack_tags_none_empty():
     slack_tags(user_ids=None).should.be.empty
+
+
+def test_slack_view_errors_response_happy():
+    result = slack_view_errors_response({"email_block": "That's not an email"})
+
+    result.should.have.key("response_action").which.should.equal("errors")
+    result.should.have.key("errors").which.should.equal(
+        {"email_block": "That's not an email"}
+    )
@@ -1,10 +1,12 @@
 import httpretty
+import requests
 import sure
 from slack_messaging import (
     slack_post_text_message,
     slack_post_blocks_message,
     slack_post_message,
 )
+from slack_secrets import CachedSecret
 
 
 @httpretty.activate(verbose=True, allow_net_connect=False)
@@ -229,3 +231,85 @@ def test_slack_post_blocks_message_401():
         )
         is False
     )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_message_401_retries_with_rotated_token():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/",
+        responses=[
+            httpretty.Response(body="", status=401),
+            httpretty.Response(body=""),
+        ],
+    )
+    tokens = iter(["old-token", "new-token"])
+
+    assert (
+        slack_post_message(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token=CachedSecret(
+                lambda: next(tokens), min_refresh_interval=0
+            ),
+            channel="test-channel",
+            message={"text": "test message"},
+        )
+        is True
+    )
+
+    httpretty.last_request().headers.should.have.key(
+        "Authorization"
+    ).which.should.equal("Bearer new-token")
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_message_invalid_auth_retries_with_rotated_token():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/",
+        responses=[
+            httpretty.Response(body='{"ok": false, "error": "invalid_auth"}'),
+            httpretty.Response(body='{"ok": true}'),
+        ],
+    )
+    tokens = iter(["old-token", "new-token"])
+
+    assert (
+        slack_post_message(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token=CachedSecret(
+                lambda: next(tokens), min_refresh_interval=0
+            ),
+            channel="test-channel",
+            message={"text": "test message"},
+        )
+        is True
+    )
+
+    httpretty.last_request().headers.should.have.key(
+        "Authorization"
+    ).which.should.equal("Bearer new-token")
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_message_plain_token_skips_rejection_check(monkeypatch):
+    parsed = []
+    parse = requests.Response.json
+    monkeypatch.setattr(
+        requests.Response, "json", lambda self: parsed.append(1) or parse(self)
+    )
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/",
+        body='{"ok": false, "error": "invalid_auth"}',
+    )
+
+    slack_post_message(
+        endpoint="https://test.slack.endpoint/",
+        slack_access_token="test-token",
+        channel="test-channel",
+        message={"text": "test message"},
+    )
+
+    # a plain token can't be refreshed, so the body isn't parsed looking for auth errors
+    parsed.should.have.length_of(0)
@@ -0,0 +1,106 @@
+import json
+from urllib.parse import parse_qs
+
+import httpretty
+import sure
+from slack_messaging import SlackApiError, slack_paginate, slack_users_list
+
+
+def register_pages(pages: int, calls: list, per_page: int = 3):
+    def respond(request, uri, headers):
+        form = parse_qs(request.body.decode())
+        page = int(form.get("cursor", ["0"])[0])
+        calls.append(page)
+
+        body = {
+            "ok": True,
+            "members": [f"U{page}{n}" for n in range(per_page)],
+            "response_metadata": {
+                "next_cursor": str(page + 1) if page + 1 < pages else ""
+            },
+        }
+        return 200, headers, json.dumps(body)
+
+    httpretty.register_uri(
+        httpretty.POST, "https://test.slack.endpoint/users.list", body=respond
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_paginate_all_pages():
+    calls = []
+    register_pages(3, calls)
+
+    list(
+        slack_users_list(
+            "test-token", endpoint="https://test.slack.endpoint/users.list", tier=None
+        )
+    ).should.equal(["U00", "U01", "U02", "U10", "U11", "U12", "U20", "U21", "U22"])
+    calls.should.equal([0, 1, 2])
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_paginate_without_prefetch():
+    calls = []
+    register_pages(2, calls)
+
+    list(
+        slack_paginate(
+            "test-token",
+            "https://test.slack.endpoint/users.list",
+            "members",
+            prefetch=False,
+        )
+    ).should.have.length_of(6)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_paginate_early_termination():
+    calls = []
+    register_pages(10, calls)
+
+    members = slack_paginate(
+        "test-token", "https://test.slack.endpoint/users.list", "members"
+    )
+    next(members).should.equal("U00")
+    members.close()
+
+    # at most the prefetched second page was requested
+    len(calls).should.be.lower_than(3)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_paginate_retries_rate_limited():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/users.list",
+        responses=[
+            httpretty.Response(
+                body='{"ok": false, "error": "ratelimited"}',
+                status=429,
+                adding_headers={"Retry-After": "0"},
+            ),
+            httpretty.Response(body='{"ok": true, "members": ["U1"]}'),
+        ],
+    )
+
+    list(
+        slack_paginate(
+            "test-token", "https://test.slack.endpoint/users.list", "members"
+        )
+    ).should.equal(["U1"])
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_paginate_error():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/users.list",
+        body='{"ok": false, "error": "invalid_auth"}',
+    )
+
+    list.when.called_with(
+        slack_paginate(
+            "test-token", "https://test.slack.endpoint/users.list", "members"
+        )
+    ).should.throw(SlackApiError, "invalid_auth")
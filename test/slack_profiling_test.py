@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import tracemalloc
+
+import sure
+from slack_profiling import SlackProfiler, slack_tmp_dump_sink
+from slack_serverless import slack_event_webhook_aws_api_gateway_proxy
+
+
+def busy(n):
+    return sum([i * i for i in range(n)])
+
+
+def test_unsampled_calls_straight_through():
+    reports = []
+    profiler = SlackProfiler(sample_rate=0, sink=reports.append)
+
+    profiler.run(busy, 100).should.equal(busy(100))
+    reports.should.have.length_of(0)
+
+
+def test_sampled_call_reports_hot_functions_and_allocations():
+    reports = []
+    profiler = SlackProfiler(sample_rate=1, top_n=3, sink=reports.append)
+
+    profiler.wrap(busy)(10000).should.equal(busy(10000))
+
+    reports.should.have.length_of(1)
+    reports[0]["function"].should.equal("busy")
+    len(reports[0]["hot_functions"]).should.be.lower_than_or_equal_to(3)
+    len(reports[0]["allocations"]).should.be.greater_than(0)
+
+
+def test_failing_sink_does_not_break_handler():
+    def sink(report):
+        raise RuntimeError("sink down")
+
+    SlackProfiler(sample_rate=1, sink=sink).run(busy, 10).should.equal(busy(10))
+
+
+def test_tmp_dump_sink(tmp_path):
+    SlackProfiler(sample_rate=1, sink=slack_tmp_dump_sink(str(tmp_path))).run(busy, 10)
+
+    files = os.listdir(tmp_path)
+    files.should.have.length_of(1)
+    json.loads((tmp_path / files[0]).read_text()).should.have.key("hot_functions")
+
+
+def test_webhook_decorator_profiler():
+    reports = []
+
+    @slack_event_webhook_aws_api_gateway_proxy(
+        "test-secret", profiler=SlackProfiler(sample_rate=1, sink=reports.append)
+    )
+    def handler(payload):
+        return {}
+
+    handler({"headers": {}, "body": "{}"})["statusCode"].should.equal(401)
+    reports.should.have.length_of(1)
+
+
+def test_overlapping_sampled_calls():
+    reports = []
+    profiler = SlackProfiler(sample_rate=1, sink=reports.append)
+    second_running = threading.Event()
+    first_done = threading.Event()
+    results = {}
+
+    def first():
+        second_running.wait(5)
+        return "first"
+
+    def second():
+        second_running.set()
+        first_done.wait(5)
+        return "second"
+
+    def run(name, func):
+        try:
+            results[name] = profiler.run(func)
+        except Exception as e:
+            results[name] = e
+
+    # the first call starts tracing, and finishes while the second is still running
+    first_thread = threading.Thread(target=run, args=("first", first))
+    first_thread.start()
+    second_thread = threading.Thread(target=run, args=("second", second))
+    second_thread.start()
+
+    first_thread.join(5)
+    first_done.set()
+    second_thread.join(5)
+
+    results.should.equal({"first": "first", "second": "second"})
+    reports.should.have.length_of(2)
+    tracemalloc.is_tracing().should.be.false
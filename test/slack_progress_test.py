@@ -0,0 +1,89 @@
+import json
+import time
+
+import httpretty
+import sure
+from slack_messaging import slack_progress
+
+
+def register_endpoints(updates: list):
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/chat.postMessage",
+        body='{"ok": true, "channel": "C123", "ts": "1111.2222"}',
+    )
+
+    def respond(request, uri, headers):
+        updates.append(json.loads(request.body))
+        return 200, headers, '{"ok": true}'
+
+    httpretty.register_uri(
+        httpretty.POST, "https://test.slack.endpoint/chat.update", body=respond
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_progress_coalesces_updates():
+    updates = []
+    register_endpoints(updates)
+
+    with slack_progress(
+        "test-token",
+        "test-channel",
+        {"text": "Starting"},
+        min_interval=0.2,
+        endpoint="https://test.slack.endpoint/chat.postMessage",
+        update_endpoint="https://test.slack.endpoint/chat.update",
+    ) as progress:
+        for n in range(1000):
+            progress.update(f"{n} done")
+
+        time.sleep(0.3)
+
+        for n in range(1000, 2000):
+            progress.update(f"{n} done")
+
+    len(updates).should.be.lower_than(5)
+    updates[-1].should.equal(
+        {"channel": "C123", "ts": "1111.2222", "text": "1999 done"}
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_progress_final_flush():
+    updates = []
+    register_endpoints(updates)
+
+    progress = slack_progress(
+        "test-token",
+        "test-channel",
+        {"text": "Starting"},
+        min_interval=60,
+        endpoint="https://test.slack.endpoint/chat.postMessage",
+        update_endpoint="https://test.slack.endpoint/chat.update",
+    )
+    progress.update("halfway")
+
+    progress.finish("All done").should.be.true
+
+    updates.should.equal([{"channel": "C123", "ts": "1111.2222", "text": "All done"}])
+    progress.update.when.called_with("too late").should.throw(RuntimeError)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_progress_post_failed():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/chat.postMessage",
+        body='{"ok": false, "error": "channel_not_found"}',
+    )
+
+    (
+        slack_progress(
+            "test-token",
+            "test-channel",
+            {"text": "Starting"},
+            endpoint="https://test.slack.endpoint/chat.postMessage",
+        )
+        is None
+    ).should.be.true
@@ -0,0 +1,106 @@
+import httpretty
+import requests
+import sure
+from slack_messaging import (
+    slack_response_url_post,
+    slack_response_url_uses_remaining,
+)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_response_url_post_happy():
+    httpretty.register_uri(httpretty.POST, "https://test.slack.endpoint/happy")
+
+    response = slack_response_url_post(
+        "https://test.slack.endpoint/happy", {"text": "test message"}
+    )
+
+    response.status_code.should.equal(200)
+    httpretty.last_request().body.should.equal(b'{"text": "test message"}')
+    slack_response_url_uses_remaining("https://test.slack.endpoint/happy").should.equal(
+        4
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_response_url_post_retries_server_errors():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/retry",
+        responses=[
+            httpretty.Response(body="", status=503),
+            httpretty.Response(
+                body="", status=429, adding_headers={"Retry-After": "0"}
+            ),
+            httpretty.Response(body="", status=200),
+        ],
+    )
+
+    response = slack_response_url_post(
+        "https://test.slack.endpoint/retry", {"text": "test message"}, backoff_base=0
+    )
+
+    response.status_code.should.equal(200)
+    slack_response_url_uses_remaining("https://test.slack.endpoint/retry").should.equal(
+        2
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_response_url_post_does_not_retry_client_errors():
+    httpretty.register_uri(
+        httpretty.POST, "https://test.slack.endpoint/client-error", status=404
+    )
+
+    response = slack_response_url_post(
+        "https://test.slack.endpoint/client-error", {"text": "test message"}
+    )
+
+    response.status_code.should.equal(404)
+    slack_response_url_uses_remaining(
+        "https://test.slack.endpoint/client-error"
+    ).should.equal(4)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_response_url_post_keeps_reserved_uses():
+    httpretty.register_uri(
+        httpretty.POST, "https://test.slack.endpoint/reserved", status=500
+    )
+
+    response = slack_response_url_post(
+        "https://test.slack.endpoint/reserved",
+        {"text": "test message"},
+        max_attempts=10,
+        backoff_base=0,
+        reserved_uses=2,
+    )
+
+    response.status_code.should.equal(500)
+    slack_response_url_uses_remaining(
+        "https://test.slack.endpoint/reserved"
+    ).should.equal(2)
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_response_url_post_exhausted():
+    httpretty.register_uri(httpretty.POST, "https://test.slack.endpoint/exhausted")
+
+    for _ in range(5):
+        slack_response_url_post(
+            "https://test.slack.endpoint/exhausted", {"text": "test message"}
+        ).status_code.should.equal(200)
+
+    (
+        slack_response_url_post(
+            "https://test.slack.endpoint/exhausted", {"text": "test message"}
+        )
+        is None
+    ).should.be.true
+
+
+def test_slack_response_url_post_raises_after_connection_errors():
+    # nothing listens on the discard port, so every attempt fails to connect
+    slack_response_url_post.when.called_with(
+        "http://127.0.0.1:9/", {"text": "test message"}, max_attempts=2, backoff_base=0
+    ).should.throw(requests.ConnectionError)
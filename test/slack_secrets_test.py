@@ -0,0 +1,90 @@
+import time
+
+import sure
+from slack_secrets import (
+    CachedSecret,
+    EnvSecret,
+    StaticSecret,
+    slack_secret_from_file,
+    slack_secret_refresh,
+    slack_secret_value,
+)
+from slack_serverless import slack_slash_command
+
+from . import sign
+
+
+def test_slack_secret_value_plain_string():
+    slack_secret_value("plain").should.equal("plain")
+    (slack_secret_refresh("plain") is None).should.be.true
+
+
+def test_static_secret_happy():
+    slack_secret_value(StaticSecret("static")).should.equal("static")
+
+
+def test_env_secret_happy(monkeypatch):
+    monkeypatch.setenv("SLACK_TEST_SECRET", "from-env")
+
+    slack_secret_value(EnvSecret("SLACK_TEST_SECRET")).should.equal("from-env")
+
+
+def test_file_secret_happy(tmp_path):
+    secret_file = tmp_path / "secret"
+    secret_file.write_text("from-file\n")
+
+    slack_secret_value(slack_secret_from_file(str(secret_file))).should.equal(
+        "from-file"
+    )
+
+
+def test_cached_secret_fetches_lazily_once():
+    calls = []
+    secret = CachedSecret(lambda: calls.append(1) or "cached", ttl=300)
+
+    calls.should.have.length_of(0)
+    secret.get().should.equal("cached")
+    secret.get().should.equal("cached")
+    calls.should.have.length_of(1)
+
+
+def test_cached_secret_refreshes_in_background_after_ttl():
+    values = iter(["first", "second"])
+    secret = CachedSecret(lambda: next(values), ttl=0)
+
+    secret.get().should.equal("first")
+    # stale value is served while the refresh happens in the background
+    secret.get().should.equal("first")
+
+    deadline = time.monotonic() + 2
+    while secret.get() != "second" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    secret.get().should.equal("second")
+
+
+def test_cached_secret_refresh_is_rate_limited():
+    values = iter(["first", "second"])
+    secret = CachedSecret(lambda: next(values), ttl=300, min_refresh_interval=300)
+
+    secret.get().should.equal("first")
+    secret.refresh().should.equal("first")
+
+
+def test_slash_command_retries_with_rotated_secret():
+    values = iter(["old-secret", "new-secret"])
+    secret = CachedSecret(lambda: next(values), ttl=300, min_refresh_interval=0)
+
+    body = b"text=hello"
+    timestamp, signature = sign(body, "new-secret")
+    headers = {"X-Slack-Request-Timestamp": timestamp, "X-Slack-Signature": signature}
+
+    handler = slack_slash_command(
+        secret,
+        lambda request, name: headers.get(name),
+        lambda request: body,
+        lambda raw_body: {"text": [raw_body.decode()]},
+        lambda response, status: (response, status),
+    )(lambda payload: {"text": "ok"})
+
+    handler({}).should.equal(({"text": "ok"}, 200))
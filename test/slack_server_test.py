@@ -0,0 +1,135 @@
+import asyncio
+import io
+import json
+
+import sure
+from slack_admission import LOW, PriorityClass, SlackAdmissionController
+from slack_server import (
+    slack_event_webhook_asgi,
+    slack_event_webhook_wsgi,
+    slack_slash_command_asgi,
+    slack_slash_command_wsgi,
+)
+
+from . import SECRET, sign
+
+
+def call_wsgi(app, body: bytes, secret: str = SECRET):
+    timestamp, signature = sign(body, secret)
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "CONTENT_LENGTH": str(len(body)),
+        "HTTP_X_SLACK_REQUEST_TIMESTAMP": timestamp,
+        "HTTP_X_SLACK_SIGNATURE": signature,
+        "wsgi.input": io.BytesIO(body),
+    }
+    started = {}
+
+    def start_response(status, headers):
+        started["status"] = status
+
+    result = b"".join(app(environ, start_response))
+    return started["status"], json.loads(result)
+
+
+async def request_asgi(app, body: bytes, secret: str = SECRET):
+    timestamp, signature = sign(body, secret)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [
+            (b"x-slack-request-timestamp", timestamp.encode()),
+            (b"x-slack-signature", signature.encode()),
+        ],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def call_asgi(app, body: bytes, secret: str = SECRET):
+    return asyncio.run(request_asgi(app, body, secret))
+
+
+def test_slack_slash_command_wsgi_happy():
+    @slack_slash_command_wsgi(SECRET)
+    def app(payload):
+        return {"text": payload["text"][0]}
+
+    call_wsgi(app, b"text=hello").should.equal(("200 OK", {"text": "hello"}))
+
+
+def test_slack_slash_command_wsgi_bad_signature():
+    @slack_slash_command_wsgi(SECRET)
+    def app(payload):
+        return {"text": "nope"}
+
+    call_wsgi(app, b"text=hello", "wrong-secret")[0].should.equal("401 Unauthorized")
+
+
+def test_slack_event_webhook_wsgi_url_verification():
+    @slack_event_webhook_wsgi(SECRET)
+    def app(payload):
+        return {}
+
+    call_wsgi(app, b'{"type": "url_verification", "challenge": "abc"}').should.equal(
+        ("200 OK", {"challenge": "abc"})
+    )
+
+
+def test_slack_slash_command_asgi_sync_handler():
+    @slack_slash_command_asgi(SECRET)
+    def app(payload):
+        return {"text": payload["text"][0]}
+
+    call_asgi(app, b"text=hello").should.equal((200, {"text": "hello"}))
+
+
+def test_slack_event_webhook_asgi_async_handler():
+    @slack_event_webhook_asgi(SECRET)
+    async def app(payload):
+        await asyncio.sleep(0)
+        return {"seen": payload["event"]["type"]}
+
+    call_asgi(app, b'{"event": {"type": "app_mention"}}').should.equal(
+        (200, {"seen": "app_mention"})
+    )
+
+
+def test_slack_event_webhook_asgi_bad_signature():
+    @slack_event_webhook_asgi(SECRET)
+    async def app(payload):
+        return {}
+
+    call_asgi(app, b"{}", "wrong-secret")[0].should.equal(401)
+
+
+def test_slack_event_webhook_asgi_sheds_over_in_flight_limit():
+    admission = SlackAdmissionController(classes={LOW: PriorityClass(max_in_flight=1)})
+    hooks = []
+
+    @slack_event_webhook_asgi(
+        SECRET, init_hooks=[lambda: hooks.append("run")], admission=admission
+    )
+    async def app(payload):
+        await asyncio.sleep(0.05)
+        return {"seen": payload["event"]["type"]}
+
+    async def storm():
+        body = b'{"event": {"type": "message"}}'
+        return await asyncio.gather(request_asgi(app, body), request_asgi(app, body))
+
+    hooks.should.equal(["run"])
+    sorted(asyncio.run(storm()), key=str).should.equal(
+        [(200, {"seen": "message"}), (200, {})]
+    )
+    admission.stats()[LOW].should.equal(
+        {"admitted": 1, "shed": 1, "deferred": 0, "in_flight": 0}
+    )
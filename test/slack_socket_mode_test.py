@@ -0,0 +1,300 @@
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sure
+from websockets.sync.server import serve
+
+from slack_socket_mode import SlackSocketModeRunner
+
+
+class StandInSlack:
+    """
+    Local stand-in for Slack: apps.connections.open (and response URLs) over HTTP, and the
+    Socket Mode WebSocket server itself.
+    """
+
+    def __init__(self):
+        self.outgoing = queue.Queue()
+        self.acks = []
+        self.responses = []
+        self.opens = 0
+        self.connections = 0
+        self.closed = threading.Event()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if self.path == "/response":
+                    stand_in.responses.append(json.loads(body))
+                    reply = {"ok": True}
+                else:
+                    stand_in.opens += 1
+                    reply = {"ok": True, "url": f"ws://127.0.0.1:{stand_in.ws_port}/"}
+
+                encoded = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.ws = serve(self._connection, "127.0.0.1", 0)
+        self.ws_port = self.ws.socket.getsockname()[1]
+
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+        threading.Thread(target=self.ws.serve_forever, daemon=True).start()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.http.server_address[1]}/apps.connections.open"
+
+    @property
+    def response_url(self) -> str:
+        return f"http://127.0.0.1:{self.http.server_address[1]}/response"
+
+    def send(self, message: dict | str):
+        self.outgoing.put(message)
+
+    def close(self):
+        self.closed.set()
+        self.ws.shutdown()
+        self.http.shutdown()
+
+    def _connection(self, websocket):
+        self.connections += 1
+        websocket.send(json.dumps({"type": "hello"}))
+
+        def read_acks():
+            for message in websocket:
+                self.acks.append(json.loads(message)["envelope_id"])
+
+        threading.Thread(target=read_acks, daemon=True).start()
+
+        while not self.closed.is_set():
+            try:
+                message = self.outgoing.get(timeout=0.01)
+            except queue.Empty:
+                continue
+
+            if message == "drop":
+                websocket.close()
+                return
+
+            websocket.send(json.dumps(message))
+
+            if message.get("type") == "disconnect":
+                return
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def event_envelope(n: int) -> dict:
+    return {
+        "envelope_id": f"env-{n}",
+        "type": "events_api",
+        "payload": {
+            "type": "event_callback",
+            "event_id": f"Ev{n}",
+            "event": {"type": "app_mention", "text": f"hi {n}"},
+        },
+    }
+
+
+def test_events_are_acked_and_dispatched():
+    slack = StandInSlack()
+    events = []
+
+    runner = SlackSocketModeRunner(
+        "xapp-test",
+        event_func=lambda body: events.append(body["event_id"]),
+        connections=1,
+        endpoint=slack.endpoint,
+    ).start()
+
+    try:
+        for n in range(5):
+            slack.send(event_envelope(n))
+
+        wait_for(lambda: len(events) == 5)
+        wait_for(lambda: len(slack.acks) == 5)
+
+        sorted(events).should.equal([f"Ev{n}" for n in range(5)])
+        sorted(slack.acks).should.equal([f"env-{n}" for n in range(5)])
+        runner.stats()["handled"].should.equal(5)
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_slash_command_uses_webhook_contract_and_response_url():
+    slack = StandInSlack()
+    payloads = []
+
+    def slash_command(payload):
+        payloads.append(payload)
+        return {"text": f"you said {payload['text'][0]}"}
+
+    runner = SlackSocketModeRunner(
+        "xapp-test",
+        slash_command_func=slash_command,
+        connections=1,
+        endpoint=slack.endpoint,
+    ).start()
+
+    try:
+        slack.send(
+            {
+                "envelope_id": "env-slash",
+                "type": "slash_commands",
+                "payload": {
+                    "command": "/hi",
+                    "text": "hello",
+                    "response_url": slack.response_url,
+                },
+            }
+        )
+
+        wait_for(lambda: len(slack.responses) == 1)
+
+        payloads[0]["command"].should.equal(["/hi"])
+        payloads[0]["text"].should.equal(["hello"])
+        slack.responses.should.equal([{"text": "you said hello"}])
+        wait_for(lambda: slack.acks == ["env-slash"])
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_unhandled_types_are_acked_and_ignored():
+    slack = StandInSlack()
+
+    runner = SlackSocketModeRunner(
+        "xapp-test", connections=1, endpoint=slack.endpoint
+    ).start()
+
+    try:
+        slack.send({"envelope_id": "env-x", "type": "interactive", "payload": {}})
+
+        wait_for(lambda: runner.stats()["ignored"] == 1)
+        wait_for(lambda: slack.acks == ["env-x"])
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_reconnects_when_slack_asks():
+    slack = StandInSlack()
+    events = []
+
+    runner = SlackSocketModeRunner(
+        "xapp-test",
+        event_func=lambda body: events.append(body["event_id"]),
+        connections=1,
+        endpoint=slack.endpoint,
+    ).start()
+
+    try:
+        slack.send({"type": "disconnect", "reason": "refresh_requested"})
+        slack.send(event_envelope(1))
+
+        wait_for(lambda: events == ["Ev1"])
+
+        slack.opens.should.equal(2)
+        runner.stats()["reconnects"].should.equal(1)
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_reconnects_when_connection_drops():
+    slack = StandInSlack()
+    events = []
+
+    runner = SlackSocketModeRunner(
+        "xapp-test",
+        event_func=lambda body: events.append(body["event_id"]),
+        connections=1,
+        reconnect_delay=0.01,
+        endpoint=slack.endpoint,
+    ).start()
+
+    try:
+        slack.send("drop")
+        slack.send(event_envelope(2))
+
+        wait_for(lambda: events == ["Ev2"])
+
+        runner.stats()["connects"].should.equal(2)
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_handler_failures_are_counted():
+    slack = StandInSlack()
+
+    def event(body):
+        raise RuntimeError("boom")
+
+    runner = SlackSocketModeRunner(
+        "xapp-test", event_func=event, connections=1, endpoint=slack.endpoint
+    ).start()
+
+    try:
+        slack.send(event_envelope(3))
+
+        wait_for(lambda: runner.stats()["failed"] == 1)
+        wait_for(lambda: slack.acks == ["env-3"])
+    finally:
+        runner.stop()
+        slack.close()
+
+
+def test_pooled_connections_handle_a_burst():
+    slack = StandInSlack()
+    handled = []
+    lock = threading.Lock()
+
+    def event(body):
+        time.sleep(0.001)
+        with lock:
+            handled.append(body["event_id"])
+
+    runner = SlackSocketModeRunner(
+        "xapp-test",
+        event_func=event,
+        connections=3,
+        max_workers=4,
+        max_pending=8,
+        endpoint=slack.endpoint,
+    ).start()
+
+    try:
+        wait_for(lambda: runner.stats()["connects"] == 3)
+
+        for n in range(300):
+            slack.send(event_envelope(n))
+
+        wait_for(lambda: len(handled) == 300, timeout=20)
+
+        sorted(handled).should.equal(sorted(f"Ev{n}" for n in range(300)))
+        wait_for(lambda: len(slack.acks) == 300)
+    finally:
+        runner.stop()
+        slack.close()
@@ -0,0 +1,140 @@
+import json
+
+import httpretty
+import sure
+from slack_secrets import SlackSecretProvider
+from slack_messaging import (
+    slack_chunk_blocks,
+    slack_post_streamed_blocks,
+    slack_post_streamed_lines,
+    slack_text_sections,
+)
+
+
+def test_slack_chunk_blocks_splits_at_limit():
+    chunks = list(slack_chunk_blocks(({"n": n} for n in range(120)), max_blocks=50))
+
+    [len(chunk) for chunk in chunks].should.equal([50, 50, 20])
+
+
+def test_slack_chunk_blocks_flushes_partial_after_max_wait():
+    chunks = list(slack_chunk_blocks(({"n": n} for n in range(3)), max_wait=0))
+
+    [len(chunk) for chunk in chunks].should.equal([1, 1, 1])
+
+
+def test_slack_text_sections_respects_line_boundaries():
+    sections = list(slack_text_sections(["a" * 6, "b" * 3, "c" * 6], max_chars=10))
+
+    [section["text"]["text"] for section in sections].should.equal(
+        ["aaaaaa\nbbb", "cccccc"]
+    )
+
+
+def test_slack_text_sections_splits_overlong_lines():
+    sections = list(slack_text_sections(["x", "y" * 25], max_chars=10))
+
+    [section["text"]["text"] for section in sections].should.equal(
+        ["x", "y" * 10, "y" * 10, "y" * 5]
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_streamed_blocks_threads_replies():
+    bodies = []
+
+    def respond(request, uri, headers):
+        bodies.append(json.loads(request.body))
+        return 200, headers, '{"ok": true, "ts": "1111.2222"}'
+
+    httpretty.register_uri(httpretty.POST, "https://test.slack.endpoint/", body=respond)
+
+    assert (
+        slack_post_streamed_blocks(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token="test-token",
+            channel="test-channel",
+            blocks=({"n": n} for n in range(120)),
+            max_wait=None,
+        )
+        is True
+    )
+
+    [len(body["blocks"]) for body in bodies].should.equal([50, 50, 20])
+    bodies[0].shouldnt.have.key("thread_ts")
+    bodies[1].should.have.key("thread_ts").which.should.equal("1111.2222")
+    bodies[2].should.have.key("thread_ts").which.should.equal("1111.2222")
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_streamed_lines_stops_after_failure():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/",
+        body='{"ok": false, "error": "channel_not_found"}',
+    )
+
+    assert (
+        slack_post_streamed_lines(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token="test-token",
+            channel="test-channel",
+            lines=("line" for _ in range(10)),
+            max_blocks=1,
+            max_wait=0,
+        )
+        is False
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_streamed_blocks_retries_rate_limited_chunks():
+    bodies = []
+
+    def respond(request, uri, headers):
+        bodies.append(json.loads(request.body))
+
+        if len(bodies) == 2:
+            return 429, {**headers, "Retry-After": "0"}, '{"ok": false}'
+
+        return 200, headers, '{"ok": true, "ts": "1111.2222"}'
+
+    httpretty.register_uri(httpretty.POST, "https://test.slack.endpoint/", body=respond)
+
+    assert (
+        slack_post_streamed_blocks(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token="test-token",
+            channel="test-channel",
+            blocks=({"n": n} for n in range(120)),
+            max_wait=None,
+        )
+        is True
+    )
+
+    [len(body["blocks"]) for body in bodies].should.equal([50, 50, 50, 20])
+    bodies[2].should.equal(bodies[1])
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_post_streamed_blocks_fails_when_token_unavailable():
+    class UnavailableSecret(SlackSecretProvider):
+        def get(self) -> str:
+            raise RuntimeError("secret store unavailable")
+
+    httpretty.register_uri(
+        httpretty.POST, "https://test.slack.endpoint/", body='{"ok": true}'
+    )
+
+    assert (
+        slack_post_streamed_blocks(
+            endpoint="https://test.slack.endpoint/",
+            slack_access_token=UnavailableSecret(),
+            channel="test-channel",
+            blocks=({"n": n} for n in range(120)),
+            max_wait=None,
+        )
+        is False
+    )
+
+    httpretty.latest_requests().should.have.length_of(0)
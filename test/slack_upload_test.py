@@ -0,0 +1,93 @@
+import io
+import json
+from urllib.parse import parse_qs
+
+import httpretty
+import sure
+from slack_messaging import slack_upload_file
+
+
+def register_endpoints(uploads: list, completes: list):
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/files.getUploadURLExternal",
+        body='{"ok": true, "upload_url": "https://test.slack.upload/abc", "file_id": "F123"}',
+    )
+
+    def upload(request, uri, headers):
+        uploads.append((request.headers.get("Content-Length"), bytes(request.body)))
+        return 200, headers, "OK"
+
+    httpretty.register_uri(httpretty.POST, "https://test.slack.upload/abc", body=upload)
+
+    def complete(request, uri, headers):
+        completes.append(parse_qs(request.body.decode()))
+        return 200, headers, '{"ok": true}'
+
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/files.completeUploadExternal",
+        body=complete,
+    )
+
+
+def upload(source, **kwargs):
+    return slack_upload_file(
+        "test-token",
+        source,
+        "report.csv",
+        upload_url_endpoint="https://test.slack.endpoint/files.getUploadURLExternal",
+        complete_endpoint="https://test.slack.endpoint/files.completeUploadExternal",
+        **kwargs,
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_upload_file_from_path(tmp_path):
+    uploads, completes = [], []
+    register_endpoints(uploads, completes)
+    path = tmp_path / "report.csv"
+    path.write_bytes(b"a,b\n" * 1000)
+
+    upload(str(path), channel_id="C123", chunk_size=1000).should.equal("F123")
+
+    uploads.should.equal([("4000", b"a,b\n" * 1000)])
+    completes[0]["channel_id"].should.equal(["C123"])
+    json.loads(completes[0]["files"][0]).should.equal(
+        [{"id": "F123", "title": "report.csv"}]
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_upload_file_from_generator():
+    uploads, completes = [], []
+    register_endpoints(uploads, completes)
+
+    upload((b"line %d\n" % n for n in range(100)), chunk_size=64).should.equal("F123")
+
+    expected = b"".join(b"line %d\n" % n for n in range(100))
+    uploads.should.equal([(str(len(expected)), expected)])
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_upload_file_from_file_object():
+    uploads, completes = [], []
+    register_endpoints(uploads, completes)
+
+    upload(io.BytesIO(b"0123456789"), title="Digits", chunk_size=3).should.equal("F123")
+
+    uploads.should.equal([("10", b"0123456789")])
+    json.loads(completes[0]["files"][0]).should.equal(
+        [{"id": "F123", "title": "Digits"}]
+    )
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+def test_slack_upload_file_get_url_failed():
+    httpretty.register_uri(
+        httpretty.POST,
+        "https://test.slack.endpoint/files.getUploadURLExternal",
+        body='{"ok": false, "error": "invalid_auth"}',
+    )
+
+    (upload(b"content") is None).should.be.true
@@ -0,0 +1,118 @@
+import subprocess
+import sys
+
+import sure
+from slack_deferral import InMemoryDeferralBackend, slack_deferred_handler
+from slack_secrets import CachedSecret
+from slack_serverless import (
+    WARMUP_KEY,
+    slack_event_webhook_aws_api_gateway_proxy,
+    slack_prewarm_secret,
+    slack_run_init_hooks,
+    slack_slash_command_aws_api_gateway_proxy,
+    slack_warmup_stats,
+    verify_slack_request,
+)
+
+from . import SOURCE_PATH, sign
+
+
+def test_init_hooks_run_at_decoration_time():
+    calls = []
+
+    slack_slash_command_aws_api_gateway_proxy(
+        "test-secret", init_hooks=[lambda: calls.append("hook")]
+    )
+
+    calls.should.equal(["hook"])
+
+
+def test_deferred_handler_init_hooks_run_at_decoration_time():
+    calls = []
+
+    slack_deferred_handler(
+        InMemoryDeferralBackend(), init_hooks=[lambda: calls.append("hook")]
+    )
+
+    calls.should.equal(["hook"])
+
+
+def test_failing_init_hook_does_not_break_decoration():
+    def hook():
+        raise RuntimeError("no network")
+
+    slack_slash_command_aws_api_gateway_proxy("test-secret", init_hooks=[hook])
+
+
+def test_run_init_hooks_skips_failures():
+    calls = []
+
+    def failing():
+        raise RuntimeError("no network")
+
+    slack_run_init_hooks([failing, lambda: calls.append("hook")])
+
+    calls.should.equal(["hook"])
+
+
+def test_prewarm_secret_hook():
+    fetches = []
+    secret = CachedSecret(lambda: fetches.append(1) or "prewarmed-secret", ttl=300)
+
+    slack_prewarm_secret(secret)()
+    fetches.should.have.length_of(1)
+
+    timestamp, signature = sign(b"text=hello", "prewarmed-secret")
+    verify_slack_request(secret, timestamp, signature, b"text=hello").should.be.true
+    fetches.should.have.length_of(1)
+
+
+def test_warmup_ping_short_circuits():
+    calls = []
+    before = slack_warmup_stats()
+
+    @slack_slash_command_aws_api_gateway_proxy("test-secret")
+    def handler(payload):
+        calls.append(payload)
+
+    response = handler({WARMUP_KEY: True})
+
+    response["statusCode"].should.equal(200)
+    calls.should.have.length_of(0)
+    slack_warmup_stats()["warmups"].should.equal(before["warmups"] + 1)
+
+
+def test_scheduled_event_is_warmup():
+    @slack_event_webhook_aws_api_gateway_proxy("test-secret")
+    def handler(payload):
+        raise AssertionError("should not be called")
+
+    handler({"source": "aws.events", "detail-type": "Scheduled Event"})[
+        "statusCode"
+    ].should.equal(200)
+
+
+def test_non_warmup_still_verified():
+    @slack_event_webhook_aws_api_gateway_proxy("test-secret")
+    def handler(payload):
+        raise AssertionError("should not be called")
+
+    handler({"headers": {}, "body": "{}"})["statusCode"].should.equal(401)
+
+
+def test_webhook_module_import_stays_light():
+    # what a webhook cold start pays for, before any handler code runs
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, slack_serverless; print(' '.join(sys.modules))",
+        ],
+        cwd=SOURCE_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    for heavy in ("slack_deferral", "asyncio", "requests", "sqlite3", "cProfile"):
+        loaded.shouldnt.contain(heavy)